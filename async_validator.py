@@ -0,0 +1,312 @@
+import asyncio
+import random
+from functools import partial
+
+import validator
+from helpers.async_client import AsyncDynamicAPIClient
+from helpers.rate_limiter import RateLimiter, get_rate_limiter
+from validator import (
+    API_KEY,
+    BASE_URL,
+    FLEET,
+    FLEET_MAX_WORKERS,
+    FLEET_SAMPLE_SIZE,
+    RATE_LIMIT_MAX_RPS,
+    RATE_LIMIT_RPS,
+    RATE_LIMIT_TARGET_LATENCY,
+    _dummy_rates,
+    _pre_work,
+    _print,
+)
+
+
+class PrefetchedClient():
+    """Stands in for `DynamicAPIClient` in the checks of `validator.py`.
+
+    Payloads are fetched beforehand with `AsyncDynamicAPIClient`, then
+    returned, or their errors raised, when the checks ask for them, so the
+    checks run unchanged off the event loop.
+    """
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+        self._results = {}
+
+    async def fetch(self, client: AsyncDynamicAPIClient, method: str, *args):
+        try:
+            result = (await getattr(client, method)(*args), None)
+        except Exception as e:
+            result = (None, e)
+        self._results[(method,) + args[:1]] = result
+        return result[0]
+
+    def _result(self, method: str, *args):
+        payload, error = self._results[(method,) + args]
+        if error is not None:
+            raise error
+        return payload
+
+    def last_response_content(self):
+        # Only used to skip validating unchanged payloads.
+        return None
+
+    def get_account_information(self):
+        return self._result("get_account_information")
+
+    def get_listing_ids(self):
+        return self._result("get_listing_ids")
+
+    def get_listing_by_id(self, listing_id):
+        return self._result("get_listing_by_id", listing_id)
+
+    def get_calendar_by_listing_id(self, listing_id):
+        return self._result("get_calendar_by_listing_id", listing_id)
+
+    def post_rates(self, listing_id, rates):
+        return self._result("post_rates", listing_id)
+
+    def get_reservations_by_listing_id(self, listing_id, checkin_start_date=None):
+        return self._result("get_reservations_by_listing_id", listing_id)
+
+    def get_reservation(self, reservation_id):
+        return self._result("get_reservation", reservation_id)
+
+
+async def _fetch_listing(
+    client: AsyncDynamicAPIClient, prefetched: PrefetchedClient, listing_id: str
+):
+    """Fetches what the checks of one listing read, concurrently."""
+
+    async def fetch_reservation():
+        reservations = await prefetched.fetch(
+            client, "get_reservations_by_listing_id", listing_id
+        )
+        try:
+            reservation_id = reservations[0]["id"]
+        except (IndexError, KeyError, TypeError):
+            # The reservation check fails before asking for it.
+            return
+        await prefetched.fetch(client, "get_reservation", reservation_id)
+
+    await asyncio.gather(
+        prefetched.fetch(client, "get_listing_by_id", listing_id),
+        prefetched.fetch(client, "get_calendar_by_listing_id", listing_id),
+        fetch_reservation(),
+    )
+
+
+async def _validate_listing(client: AsyncDynamicAPIClient, listing_id: str):
+    """Runs the listing, calendar and reservations checks for one listing."""
+    prefetched = PrefetchedClient(client.base_url)
+    await _fetch_listing(client, prefetched, listing_id)
+    return await asyncio.to_thread(validator._validate_listing, prefetched, listing_id)
+
+
+async def _validate_fleet(
+    client: AsyncDynamicAPIClient,
+    listing_ids: list,
+    sample_size: int = None,
+    max_concurrency: int = FLEET_MAX_WORKERS,
+):
+    """Runs the per-listing checks for every listing of the account, or for a
+    random sample of `sample_size` listings, at most `max_concurrency`
+    listings at a time."""
+    if sample_size is not None and sample_size < len(listing_ids):
+        listing_ids = random.sample(listing_ids, sample_size)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def validate(listing_id):
+        async with semaphore:
+            try:
+                return await _validate_listing(client, listing_id)
+            except Exception as e:
+                _print(f"❌ GET /listings/{listing_id} failed with error: {e!r}")
+                return False
+
+    results = await asyncio.gather(
+        *(validate(listing_id) for listing_id in listing_ids)
+    )
+    failed_listing_ids = [
+        listing_id for listing_id, passed in zip(listing_ids, results) if not passed
+    ]
+
+    passed_count = len(listing_ids) - len(failed_listing_ids)
+    icon = "✅" if not failed_listing_ids else "❌"
+    _print(f"{icon} Fleet: {passed_count}/{len(listing_ids)} listings passed")
+    for listing_id in sorted(failed_listing_ids):
+        _print(f"    - {listing_id}")
+    return not failed_listing_ids
+
+
+def _run_checks(checks):
+    """Runs the `(name, check)` pairs of `checks` in order. A check raising
+    is reported as failed, as `validator.run` does, and the others still
+    run."""
+    for name, check in checks:
+        try:
+            check()
+        except Exception as e:
+            _print(f"❌ {name} - {e}")
+
+
+def _validate_account(prefetched: PrefetchedClient, invalid: PrefetchedClient):
+    _run_checks(
+        [
+            (
+                "GET /account status:200",
+                partial(validator._validate_account_endpoint_returns_200, prefetched),
+            ),
+            (
+                "GET /account status:401",
+                partial(
+                    validator._validate_account_endpoint_returns_401,
+                    prefetched,
+                    invalid,
+                ),
+            ),
+            (
+                "GET /listings status:200",
+                partial(
+                    validator._validate_listing_ids_endpoint_returns_200, prefetched
+                ),
+            ),
+            (
+                "GET /listings/invalid-id status:404",
+                partial(validator._validate_listing_endpoint_returns_404, prefetched),
+            ),
+            (
+                "GET /listings/invalid-id/calendar status:404",
+                partial(
+                    validator._validate_listing_calendar_endpoint_returns_404,
+                    prefetched,
+                ),
+            ),
+            (
+                "GET /listings/invalid-id/reservations status:404",
+                partial(
+                    validator._validate_listing_reservations_endpoint_returns_404,
+                    prefetched,
+                ),
+            ),
+            (
+                "GET /reservations/invalid-id status:404",
+                partial(
+                    validator._validate_reservation_endpoint_returns_404, prefetched
+                ),
+            ),
+        ]
+    )
+
+
+def _validate_post_prices(prefetched: PrefetchedClient, listing_id: str):
+    _run_checks(
+        [
+            (
+                f"POST /listings/{listing_id}/calendar status:201",
+                partial(
+                    validator._validate_post_prices_endpoint_returns_201,
+                    prefetched,
+                    listing_id,
+                ),
+            ),
+            (
+                "POST /listings/invalid-id/calendar status:404",
+                partial(
+                    validator._validate_post_prices_endpoint_returns_404, prefetched
+                ),
+            ),
+        ]
+    )
+
+
+async def run(
+    base_url: str,
+    api_key: str,
+    disable_logging: bool = True,
+    fleet: bool = False,
+    fleet_sample_size: int = None,
+    fleet_max_concurrency: int = FLEET_MAX_WORKERS,
+    rate_limiter: RateLimiter = None,
+):
+    """Runs the checks of `validator.py` against the partner API at
+    `base_url` without blocking the event loop: payloads are fetched
+    concurrently with `AsyncDynamicAPIClient`, and validated in a worker
+    thread. Pass a `rate_limiter` to pace requests and retry throttled ones."""
+    _pre_work(disable_logging=disable_logging)
+
+    async with AsyncDynamicAPIClient(
+        api_key,
+        base_url,
+        pool_maxsize=fleet_max_concurrency,
+        rate_limiter=rate_limiter,
+    ) as client:
+        invalid_client = AsyncDynamicAPIClient(
+            api_key="invalid-api-key",
+            base_url=base_url,
+            session=client.session,
+            rate_limiter=rate_limiter,
+        )
+        prefetched = PrefetchedClient(base_url)
+        invalid = PrefetchedClient(base_url)
+        await asyncio.gather(
+            prefetched.fetch(client, "get_account_information"),
+            invalid.fetch(invalid_client, "get_account_information"),
+            prefetched.fetch(client, "get_listing_ids"),
+            prefetched.fetch(client, "get_listing_by_id", "invalid-id"),
+            prefetched.fetch(client, "get_calendar_by_listing_id", "invalid-id"),
+            prefetched.fetch(client, "get_reservations_by_listing_id", "invalid-id"),
+            prefetched.fetch(client, "get_reservation", "invalid-id"),
+        )
+        await asyncio.to_thread(_validate_account, prefetched, invalid)
+
+        try:
+            listing_ids = prefetched.get_listing_ids()
+        except Exception:
+            # Already reported by the GET /listings check.
+            listing_ids = None
+        if not isinstance(listing_ids, list) or not listing_ids:
+            _print(
+                "➖ Skipped the listing and POST checks because GET /listings "
+                "returned no listing IDs."
+            )
+            return
+        if fleet:
+            await _validate_fleet(
+                client,
+                listing_ids,
+                sample_size=fleet_sample_size,
+                max_concurrency=fleet_max_concurrency,
+            )
+        else:
+            try:
+                await _validate_listing(client, listing_ids[0])
+            except Exception as e:
+                _print(f"❌ GET /listings/{listing_ids[0]} - {e}")
+        await asyncio.gather(
+            prefetched.fetch(client, "post_rates", listing_ids[0], _dummy_rates()),
+            prefetched.fetch(client, "post_rates", "invalid-id", []),
+        )
+        await asyncio.to_thread(_validate_post_prices, prefetched, listing_ids[0])
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        run(
+            BASE_URL,
+            API_KEY,
+            fleet=FLEET,
+            fleet_sample_size=FLEET_SAMPLE_SIZE,
+            fleet_max_concurrency=FLEET_MAX_WORKERS,
+            rate_limiter=(
+                get_rate_limiter(
+                    BASE_URL,
+                    rate=RATE_LIMIT_RPS,
+                    max_rate=RATE_LIMIT_MAX_RPS,
+                    target_latency=RATE_LIMIT_TARGET_LATENCY,
+                )
+                if RATE_LIMIT_RPS
+                else None
+            ),
+        )
+    )
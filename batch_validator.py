@@ -0,0 +1,250 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import time
+from collections import defaultdict, deque
+from multiprocessing.connection import wait
+from typing import List, NamedTuple
+
+import validator
+from validator import (
+    FLEET,
+    FLEET_MAX_WORKERS,
+    FLEET_SAMPLE_SIZE,
+    HEDGE_REQUESTS,
+    RATE_LIMIT_MAX_RPS,
+    RATE_LIMIT_RPS,
+    RATE_LIMIT_TARGET_LATENCY,
+    ROUTE_TIMEOUTS,
+    RUN_BUDGET,
+    STREAMING,
+    _print,
+)
+from helpers.rate_limiter import get_rate_limiter
+
+# JSON file listing the partners to validate, as
+# [{"name": "...", "base_url": "...", "api_key": "..."}, ...]
+MANIFEST_PATH = "partners.json"
+# Number of partners validated concurrently, each in its own process.
+MAX_PROCESSES = 8
+# Partners sharing a base URL, like the accounts of one channel manager, are
+# validated at most MAX_PER_BASE_URL at a time to spare its rate limits.
+MAX_PER_BASE_URL = 2
+# A partner still running after PARTNER_TIMEOUT seconds is stopped and
+# reported as failed, freeing its slots for the others.
+PARTNER_TIMEOUT = 30 * 60
+REPORT_JSON_PATH = None
+
+
+class PartnerResult(NamedTuple):
+    name: str
+    base_url: str
+    passed: bool
+    failures: int
+    elapsed_seconds: float
+    output: str
+    error: str = None
+
+
+def load_manifest(path: str) -> List[dict]:
+    with open(path) as f:
+        partners = json.load(f)
+    for index, partner in enumerate(partners):
+        missing = {"base_url", "api_key"} - partner.keys()
+        if missing:
+            raise ValueError(
+                f"Partner {index} of {path} is missing {', '.join(sorted(missing))}"
+            )
+        partner.setdefault("name", partner["base_url"])
+    return partners
+
+
+def _failed_checks(report: str) -> int:
+    # The fleet summary line restates the listings' failed checks.
+    return sum(
+        line.startswith("❌") and not line.startswith("❌ Fleet:")
+        for line in report.splitlines()
+    )
+
+
+def _validate_partner(partner: dict, **run_kwargs) -> PartnerResult:
+    """Runs the validator against one partner, capturing its report."""
+    output = io.StringIO()
+    error = None
+    started_at = time.perf_counter()
+    rate_limiter = None
+    if RATE_LIMIT_RPS:
+        # Partners sharing a base URL run in other processes, each with its
+        # own limiter, see MAX_PER_BASE_URL.
+        rate_limiter = get_rate_limiter(
+            partner["base_url"],
+            rate=RATE_LIMIT_RPS,
+            max_rate=RATE_LIMIT_MAX_RPS,
+            target_latency=RATE_LIMIT_TARGET_LATENCY,
+        )
+    with contextlib.redirect_stdout(output):
+        try:
+            validator.run(
+                partner["base_url"],
+                partner["api_key"],
+                rate_limiter=rate_limiter,
+                **run_kwargs,
+            )
+        except Exception as e:
+            error = repr(e)
+    elapsed_seconds = time.perf_counter() - started_at
+
+    report = output.getvalue()
+    failures = _failed_checks(report)
+    return PartnerResult(
+        name=partner["name"],
+        base_url=partner["base_url"],
+        passed=not failures and error is None,
+        failures=failures,
+        elapsed_seconds=elapsed_seconds,
+        output=report,
+        error=error,
+    )
+
+
+def _send_partner_result(connection, partner: dict, run_kwargs: dict):
+    with connection:
+        connection.send(_validate_partner(partner, **run_kwargs))
+
+
+def _failed_partner(partner: dict, elapsed_seconds: float, error: str):
+    return PartnerResult(
+        name=partner["name"],
+        base_url=partner["base_url"],
+        passed=False,
+        failures=0,
+        elapsed_seconds=elapsed_seconds,
+        output="",
+        error=error,
+    )
+
+
+def run_batch(
+    partners: List[dict],
+    max_processes: int = MAX_PROCESSES,
+    max_per_base_url: int = MAX_PER_BASE_URL,
+    timeout: float = PARTNER_TIMEOUT,
+    **run_kwargs,
+) -> List[PartnerResult]:
+    """Validates every partner of `partners`, each in its own process,
+    running at most `max_processes` partners at a time and at most
+    `max_per_base_url` partners sharing a base URL at a time.
+
+    A partner crashing its process fails alone, and a partner still running
+    after `timeout` seconds has its process killed and is reported as
+    failed, so it does not hold its slots. `run_kwargs` are passed to
+    `validator.run`.
+    """
+    pending = deque(partners)
+    in_flight = defaultdict(int)
+    # Receiving end of each running partner's pipe, to its process, partner
+    # and start time.
+    running = {}
+    results = []
+    while pending or running:
+        # Start the partners whose base URL is below its cap, in order.
+        for _ in range(len(pending)):
+            partner = pending.popleft()
+            if (
+                len(running) >= max_processes
+                or in_flight[partner["base_url"]] >= max_per_base_url
+            ):
+                pending.append(partner)
+                continue
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_send_partner_result,
+                args=(sender, partner, run_kwargs),
+                daemon=True,
+            )
+            process.start()
+            # Only the child holds the sending end, so the receiving end
+            # reports the end of file if it dies without a result.
+            sender.close()
+            running[receiver] = (process, partner, time.perf_counter())
+            in_flight[partner["base_url"]] += 1
+
+        next_deadline = min(started_at for _, _, started_at in running.values())
+        ready = wait(
+            list(running),
+            timeout=max(0.0, next_deadline + timeout - time.perf_counter()),
+        )
+        now = time.perf_counter()
+        for receiver in list(running):
+            process, partner, started_at = running[receiver]
+            if receiver in ready:
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    process.join()
+                    result = _failed_partner(
+                        partner,
+                        now - started_at,
+                        f"Process exited with code {process.exitcode}",
+                    )
+            elif now - started_at >= timeout:
+                process.kill()
+                result = _failed_partner(
+                    partner, now - started_at, f"Timed out after {timeout:.0f}s"
+                )
+            else:
+                continue
+            process.join()
+            receiver.close()
+            del running[receiver]
+            in_flight[partner["base_url"]] -= 1
+            results.append(result)
+    return results
+
+
+def _print_report(results: List[PartnerResult]):
+    results = sorted(results, key=lambda result: result.name)
+    for result in results:
+        if result.passed:
+            continue
+        lines = [f"===== {result.name} ({result.base_url}) ====="]
+        lines.append(result.output.rstrip())
+        if result.error is not None:
+            lines.append(f"❌ Run failed with error: {result.error}")
+        _print("\n".join(lines))
+
+    lines = []
+    for result in results:
+        icon = "✅" if result.passed else "❌"
+        details = f"{result.failures} failed checks"
+        if result.error is not None:
+            details = f"run failed with error: {result.error}"
+        lines.append(
+            f"{icon} {result.name} ({result.base_url}) - {details} "
+            f"in {result.elapsed_seconds:.1f}s"
+        )
+    passed_count = sum(result.passed for result in results)
+    icon = "✅" if passed_count == len(results) else "❌"
+    lines.append(f"{icon} Partners: {passed_count}/{len(results)} passed")
+    _print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    results = run_batch(
+        load_manifest(MANIFEST_PATH),
+        max_processes=MAX_PROCESSES,
+        max_per_base_url=MAX_PER_BASE_URL,
+        timeout=PARTNER_TIMEOUT,
+        fleet=FLEET,
+        fleet_sample_size=FLEET_SAMPLE_SIZE,
+        fleet_max_workers=FLEET_MAX_WORKERS,
+        streaming=STREAMING,
+        timeouts=ROUTE_TIMEOUTS,
+        budget=RUN_BUDGET,
+        hedge=HEDGE_REQUESTS,
+    )
+    _print_report(results)
+    if REPORT_JSON_PATH:
+        with open(REPORT_JSON_PATH, "w") as f:
+            json.dump([result._asdict() for result in results], f, indent=2)
@@ -0,0 +1,52 @@
+"""Compares the memory used by the calendars of a fleet held as the lists of
+dicts decoded from their JSON payloads against `CalendarStore`.
+
+    $ python -m benchmarks.calendar_store
+"""
+import json
+import tracemalloc
+
+from helpers import payloads
+from helpers.calendar_store import CalendarStore
+
+LISTINGS = 200
+CALENDAR_DAYS = 730
+
+
+def _allocated_bytes(build):
+    tracemalloc.start()
+    try:
+        held = build()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del held
+    return allocated
+
+
+def main():
+    # Decode each calendar from JSON, as the client does, so days do not
+    # share their strings.
+    body = json.dumps(payloads.calendar_payload(CALENDAR_DAYS))
+
+    def build_dicts():
+        return {
+            f"listing-{index}": json.loads(body) for index in range(LISTINGS)
+        }
+
+    def build_store():
+        store = CalendarStore()
+        for index in range(LISTINGS):
+            store.add(f"listing-{index}", json.loads(body))
+        return store
+
+    dicts = _allocated_bytes(build_dicts)
+    store = _allocated_bytes(build_store)
+    print(f"{LISTINGS} listings x {CALENDAR_DAYS} days")
+    print(f"{'lists of dicts':<18}{dicts / 2**20:>10.1f} MiB")
+    print(f"{'CalendarStore':<18}{store / 2**20:>10.1f} MiB")
+    print(f"{'ratio':<18}{dicts / store:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compares format checks and validations per second of calendars and
+reservations checked with `Draft202012Validator.FORMAT_CHECKER` against the
+cached date and date-time checks of `schemas.formats`.
+
+    $ python -m benchmarks.format_checking
+"""
+import time
+
+from jsonschema import Draft202012Validator
+
+from helpers import payloads
+from schemas import calendar_schema, reservation_list_schema
+from schemas.formats import FORMAT_CHECKER
+
+CALENDAR = payloads.calendar_payload(730)
+RESERVATIONS = payloads.reservation_list_payload(200)
+CASES = [
+    ("calendar (730 days)", calendar_schema, CALENDAR),
+    ("reservations (200)", reservation_list_schema, RESERVATIONS),
+]
+FORMAT_CASES = [
+    ("date (730 days)", "date", [day["date"] for day in CALENDAR]),
+    (
+        "date-time (200)",
+        "date-time",
+        [reservation["bookedAt"] for reservation in RESERVATIONS],
+    ),
+]
+
+
+def _checks_per_second(format_checker, format, values, duration=1.0):
+    count = 0
+    started_at = time.perf_counter()
+    while True:
+        for value in values:
+            format_checker.check(value, format)
+        count += len(values)
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= duration:
+            return count / elapsed
+
+
+def _validations_per_second(validator, payload, duration=1.0):
+    count = 0
+    started_at = time.perf_counter()
+    while True:
+        list(validator.iter_errors(payload))
+        count += 1
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= duration:
+            return count / elapsed
+
+
+def main():
+    print(f"{'format':<22}{'uncached/s':>14}{'cached/s':>14}{'speed-up':>10}")
+    for name, format, values in FORMAT_CASES:
+        uncached = _checks_per_second(
+            Draft202012Validator.FORMAT_CHECKER, format, values
+        )
+        cached = _checks_per_second(FORMAT_CHECKER, format, values)
+        print(f"{name:<22}{uncached:>14.0f}{cached:>14.0f}{cached / uncached:>9.2f}x")
+
+    print(f"\n{'payload':<22}{'uncached/s':>14}{'cached/s':>14}{'speed-up':>10}")
+    for name, schema, payload in CASES:
+        uncached = _validations_per_second(
+            Draft202012Validator(
+                schema, format_checker=Draft202012Validator.FORMAT_CHECKER
+            ),
+            payload,
+        )
+        cached = _validations_per_second(
+            Draft202012Validator(schema, format_checker=FORMAT_CHECKER), payload
+        )
+        print(f"{name:<22}{uncached:>14.1f}{cached:>14.1f}{cached / uncached:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compares the decode throughput of `requests.Response.json()` against the
+JSON decoders `DynamicAPIClient` can use on the raw response body.
+
+    $ python -m benchmarks.json_decoding
+"""
+import json
+import time
+
+from requests import Response
+
+from helpers import payloads
+from helpers.client import orjson
+
+CASES = [
+    ("calendar (365 days)", payloads.calendar_payload(365)),
+    ("calendar (730 days)", payloads.calendar_payload(730)),
+    ("calendar (1825 days)", payloads.calendar_payload(1825)),
+    ("reservations (200)", payloads.reservation_list_payload(200)),
+]
+
+
+def _response(body: bytes) -> Response:
+    response = Response()
+    response._content = body
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+def _decoders():
+    # `response.json()` decodes the body to text, guessing its encoding,
+    # before parsing it.
+    decoders = [
+        ("response.json()", lambda body: _response(body).json()),
+        ("json.loads", json.loads),
+    ]
+    if orjson is not None:
+        decoders.append(("orjson.loads", orjson.loads))
+    return decoders
+
+
+def _megabytes_per_second(decode, body: bytes, duration=1.0):
+    count = 0
+    started_at = time.perf_counter()
+    while True:
+        decode(body)
+        count += 1
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= duration:
+            return count * len(body) / elapsed / 2**20
+
+
+def main():
+    decoders = _decoders()
+    if orjson is None:
+        print("orjson is not installed, only the stdlib decoders are compared.")
+    header = "".join(f"{name:>18}" for name, _ in decoders)
+    print(f"{'payload':<22}{'size':>10}{header}")
+    for name, payload in CASES:
+        body = json.dumps(payload).encode()
+        throughputs = [_megabytes_per_second(decode, body) for _, decode in decoders]
+        print(
+            f"{name:<22}{len(body) / 2**10:>7.0f}KiB"
+            + "".join(f"{throughput:>13.1f}MiB/s" for throughput in throughputs)
+        )
+
+
+if __name__ == "__main__":
+    main()
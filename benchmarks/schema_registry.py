@@ -0,0 +1,64 @@
+"""Compares validations per second when building a validator for every
+payload against reusing the validators compiled by `schemas.registry`.
+
+    $ python -m benchmarks.schema_registry
+"""
+import time
+
+from jsonschema import Draft202012Validator
+
+from helpers import payloads
+from schemas import (
+    account_schema,
+    calendar_schema,
+    listings_schema,
+    reservation_list_schema,
+    reservation_schema,
+)
+from schemas.registry import get_validator
+
+CASES = [
+    ("account", account_schema, payloads.account_payload()),
+    ("listing", listings_schema, payloads.listing_payload()),
+    ("reservation", reservation_schema, payloads.reservation_payload()),
+    ("calendar (730 days)", calendar_schema, payloads.calendar_payload(730)),
+    (
+        "reservations (200)",
+        reservation_list_schema,
+        payloads.reservation_list_payload(200),
+    ),
+]
+
+
+def _validate_uncached(schema, payload):
+    validator = Draft202012Validator(
+        schema, format_checker=Draft202012Validator.FORMAT_CHECKER
+    )
+    return list(validator.iter_errors(payload))
+
+
+def _validate_cached(schema, payload):
+    return list(get_validator(schema).iter_errors(payload))
+
+
+def _validations_per_second(validate, schema, payload, duration=1.0):
+    count = 0
+    started_at = time.perf_counter()
+    while True:
+        validate(schema, payload)
+        count += 1
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= duration:
+            return count / elapsed
+
+
+def main():
+    print(f"{'payload':<22}{'uncached/s':>14}{'cached/s':>14}{'speed-up':>10}")
+    for name, schema, payload in CASES:
+        uncached = _validations_per_second(_validate_uncached, schema, payload)
+        cached = _validations_per_second(_validate_cached, schema, payload)
+        print(f"{name:<22}{uncached:>14.1f}{cached:>14.1f}{cached / uncached:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
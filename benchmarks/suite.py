@@ -0,0 +1,161 @@
+"""Benchmarks the validator against a local stub partner, so performance
+regressions show up before release.
+
+    $ python -m benchmarks.suite --output results.json
+    $ python -m benchmarks.suite --baseline results.json
+
+With `--baseline`, every benchmark is compared to the saved results and the
+suite exits with status 1 if one of them regressed by more than
+`--tolerance`.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import validator
+from helpers import payloads
+from helpers.client import DynamicAPIClient
+from schemas import calendar_schema
+from schemas.registry import get_validator
+from stub_server import StubPartnerServer
+
+
+def _serve(queue, kwargs):
+    server = StubPartnerServer(**kwargs)
+    queue.put(
+        {
+            "base_url": server.base_url,
+            "api_key": server.api_key,
+            "listing_ids": server.listing_ids,
+        }
+    )
+    server.serve_forever()
+
+
+@contextlib.contextmanager
+def _stub_process(**kwargs):
+    """Serves a `StubPartnerServer` from another process, so the stub does not
+    compete with the code under benchmark for the GIL."""
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_serve, args=(queue, kwargs), daemon=True
+    )
+    process.start()
+    try:
+        yield SimpleNamespace(**queue.get(timeout=30))
+    finally:
+        process.terminate()
+        process.join()
+
+
+def _timed_run(stub, **kwargs) -> float:
+    started_at = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        validator.run(stub.base_url, stub.api_key, **kwargs)
+    return time.perf_counter() - started_at
+
+
+def bench_run(stub, options) -> float:
+    return _timed_run(stub)
+
+
+def bench_fleet_run(stub, options) -> float:
+    return _timed_run(
+        stub, fleet=True, fleet_sample_size=options.fleet_sample_size
+    )
+
+
+def bench_client_throughput(stub, options) -> float:
+    client = DynamicAPIClient(
+        stub.api_key, stub.base_url, pool_maxsize=options.workers
+    )
+    listing_ids = [
+        stub.listing_ids[index % len(stub.listing_ids)]
+        for index in range(options.requests)
+    ]
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.workers) as executor:
+        list(executor.map(client.get_calendar_by_listing_id, listing_ids))
+    return options.requests / (time.perf_counter() - started_at)
+
+
+def bench_validation_throughput(stub, options) -> float:
+    calendar = payloads.calendar_payload(options.calendar_days)
+    schema_validator = get_validator(calendar_schema)
+    count = 0
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < 2:
+        list(schema_validator.iter_errors(calendar))
+        count += 1
+    return count / (time.perf_counter() - started_at)
+
+
+# Name, function, unit, and whether a higher value is better.
+BENCHMARKS = [
+    ("run", bench_run, "s", False),
+    ("fleet_run", bench_fleet_run, "s", False),
+    ("client_throughput", bench_client_throughput, "req/s", True),
+    ("validation_throughput", bench_validation_throughput, "calendars/s", True),
+]
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--listings", type=int, default=100)
+    parser.add_argument("--calendar-days", type=int, default=730)
+    parser.add_argument("--reservations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fleet-sample-size", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare to results saved by --output.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = _parse_args(argv)
+    baseline = {}
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    with _stub_process(
+        listings=options.listings,
+        calendar_days=options.calendar_days,
+        reservations=options.reservations,
+        latency=options.latency,
+    ) as stub:
+        for name, benchmark, unit, higher_is_better in BENCHMARKS:
+            value = benchmark(stub, options)
+            results[name] = value
+            line = f"{name:<24}{value:>12.2f} {unit}"
+            if name in baseline:
+                change = (value - baseline[name]) / baseline[name]
+                regressed = (
+                    change < -options.tolerance
+                    if higher_is_better
+                    else change > options.tolerance
+                )
+                line = f"{'❌' if regressed else '✅'} {line} ({change:+.1%})"
+                if regressed:
+                    regressions.append(name)
+            print(line)
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
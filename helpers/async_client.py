@@ -0,0 +1,219 @@
+import time
+from typing import Callable, Dict, List
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from .client import DEFAULT_JSON_DECODER, DynamicAPIClient
+from .exceptions import (
+    BadRequest,
+    InternalServerError,
+    InvalidCredentials,
+    PropertyNotFound,
+    PostingRatesError,
+    RateLimited,
+    ReservationNotFound,
+    StatusCodeException
+)
+from .rate_limiter import RateLimiter, parse_retry_after
+from .transport import DEFAULT_POOL_MAXSIZE
+
+
+class AsyncDynamicAPIClient():
+    """asyncio counterpart of `DynamicAPIClient`, built on aiohttp.
+
+    The underlying session is created on first use, inside the running event
+    loop. Close the client, or use it as an async context manager, to release
+    its connections.
+    """
+
+    ROUTES = DynamicAPIClient.ROUTES
+    ALLOWED_STATUS_CODES = DynamicAPIClient.ALLOWED_STATUS_CODES
+
+    def __init__(
+        self,
+        api_key,
+        base_url,
+        session: ClientSession = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        rate_limiter: RateLimiter = None,
+        json_decoder: Callable[[bytes], object] = None,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url
+        self.allowed_status_codes = self.ALLOWED_STATUS_CODES
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = rate_limiter
+        self.json_decoder = json_decoder or DEFAULT_JSON_DECODER
+        self._session = session
+        self._owns_session = session is None
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None:
+            self._session = ClientSession(
+                connector=TCPConnector(limit_per_host=self.pool_maxsize),
+                timeout=ClientTimeout(total=300),
+            )
+        return self._session
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _request(self, method, headers=None, **kwargs):
+        new_headers = {
+            "x-api-key": self.api_key,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        if headers:
+            headers.update(new_headers)
+        else:
+            headers = new_headers
+        url = self.base_url + kwargs.pop("path")
+        max_attempts = 1
+        if self.rate_limiter is not None:
+            max_attempts += self.rate_limiter.max_retries
+        for attempt in range(max_attempts):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            started_at = time.perf_counter()
+            async with self.session.request(
+                method, url, headers=headers, **kwargs
+            ) as response:
+                # Read the body before the connection goes back to the pool.
+                # The response keeps it for `text()`, and the bytes are kept
+                # for `_json`, as `read()` refuses to run once it is released.
+                response.body = await response.read()
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(
+                    response.status,
+                    latency=time.perf_counter() - started_at,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+            if response.status != 429:
+                break
+
+        if response.status == 429:
+            raise RateLimited(
+                f"{self.base_url}: Requests were still rate limited after "
+                f"{attempt + 1} attempts",
+                status_code=response.status,
+                response=response,
+            )
+        if response.status not in self.allowed_status_codes:
+            raise StatusCodeException(
+                f"{self.base_url}: Response status code was "
+                f"{response.status}, `allowed_status_codes` are:"
+                f" {self.allowed_status_codes}",
+                status_code=response.status,
+                response=response,
+            )
+        if response.status == 500:
+            raise InternalServerError(
+                f"Request failed with error: {await response.text()}"
+            )
+
+        if response.status == 400:
+            raise BadRequest(f"Request failed with error: {await response.text()}")
+
+        if response.status == 401:
+            raise InvalidCredentials(
+                f"Authentication failed with error: {await response.text()}"
+            )
+
+        return response
+
+    async def _json(self, response):
+        # Decode the bytes read by `_request` directly, `response.json()`
+        # first decodes them to text.
+        return self.json_decoder(response.body)
+
+    async def _get(self, **kwargs):
+        return await self._request("GET", **kwargs)
+
+    async def _post(self, json, **kwargs):
+        return await self._request("POST", json=json, **kwargs)
+
+    async def get_account_information(self):
+        """Fetch account information."""
+        response = await self._get(path=self.ROUTES["PATH_ACCOUNT"])
+        data = await self._json(response)
+        return data
+
+    async def get_listing_ids(self):
+        """Fetch all Listings."""
+        response = await self._get(path=self.ROUTES["PATH_LISTINGS"])
+        data = await self._json(response)
+        return data
+
+    async def get_listing_by_id(self, listing_id):
+        """Fetch a listing by Listing ID"""
+        path = self.ROUTES["PATH_LISTING"].format(listing_id=listing_id)
+        response = await self._get(path=path)
+        if response.status == 404:
+            raise PropertyNotFound(
+                f"Failed to get listing with id: {listing_id} with error response: {await response.text()}"
+            )
+        data = await self._json(response)
+        return data
+
+    async def get_calendar_by_listing_id(self, listing_id):
+        """Fetch calendar by Listing ID."""
+        path = self.ROUTES["PATH_CALENDAR"].format(listing_id=listing_id)
+        response = await self._get(path=path)
+        if response.status == 404:
+            raise PropertyNotFound(
+                f"Failed to get listing with id: {listing_id} with error response: {await response.text()}"
+            )
+
+        data = await self._json(response)
+        return data
+
+    async def post_rates(self, listing_id, rates: List[Dict]):
+        """Post rates information by Listing ID."""
+        path = self.ROUTES["PATH_CALENDAR"].format(listing_id=listing_id)
+        try:
+            response = await self._post(path=path, json=rates)
+        except BadRequest as e:
+            raise PostingRatesError(
+                f"Failed to post rates to listing {listing_id}: {e}"
+            ) from e
+        if response.status == 404:
+            raise PropertyNotFound(
+                f"Failed to get listing with id: {listing_id} with error response: {await response.text()}"
+            )
+        return []
+
+    async def get_reservations_by_listing_id(self, listing_id, checkin_start_date=None):
+        """Fetch reservations by Listing ID"""
+        path = self.ROUTES["PATH_LISTING_RESERVATION"].format(listing_id=listing_id)
+        params = dict()
+        if checkin_start_date:
+            params.update({"checkinStartDate": checkin_start_date.strftime("%Y-%m-%d")})
+        response = await self._get(path=path, params=params)
+
+        if response.status == 404:
+            raise PropertyNotFound(
+                f"Failed to get listing with id: {listing_id} with error response: {await response.text()}"
+            )
+        data = await self._json(response)
+        return data
+
+    async def get_reservation(self, reservation_id):
+        """Fetch a reservation by Reservation ID."""
+        path = self.ROUTES["PATH_RESERVATION"].format(reservation_id=reservation_id)
+        response = await self._get(path=path)
+        if response.status == 404:
+            raise ReservationNotFound(
+                f"Failed to get reservation with id: {reservation_id} with error response: {await response.text()}"
+            )
+        data = await self._json(response)
+        return data
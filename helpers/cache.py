@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from requests import Response
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 300
+
+
+class CachedResponse(NamedTuple):
+    response: Response
+    etag: Optional[str]
+    stored_at: float
+
+    @property
+    def size(self):
+        return len(self.response.content)
+
+
+class ResponseCache():
+    """Thread-safe LRU cache of successful GET responses.
+
+    Responses younger than `ttl` seconds are served without hitting the
+    network. Older ones are kept until evicted, so they can be revalidated
+    with their ETag. Least recently used responses are evicted once the cache
+    holds more than `max_entries` responses or `max_bytes` bytes of body.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.monotonic() - entry.stored_at < self.ttl
+
+    def get(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, response: Response) -> None:
+        entry = CachedResponse(
+            response=response,
+            etag=response.headers.get("ETag"),
+            stored_at=time.monotonic(),
+        )
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while (
+                len(self._entries) > self.max_entries
+                or self._size > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def refresh(self, key) -> None:
+        """Marks the response stored for `key` as fresh again, after the
+        partner confirmed it did not change."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = entry._replace(stored_at=time.monotonic())
+
+    def expire(self) -> None:
+        """Marks every stored response as stale, to be revalidated with its
+        ETag the next time it is requested."""
+        with self._lock:
+            for key, entry in self._entries.items():
+                self._entries[key] = entry._replace(stored_at=float("-inf"))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
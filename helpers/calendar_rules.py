@@ -0,0 +1,175 @@
+import datetime
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from .calendar_store import (
+    AVAILABILITY_CODES,
+    MISSING_DATE,
+    MISSING_MIN_NIGHTS,
+    CalendarStore,
+)
+
+DEFAULT_MAX_DAILY_PRICE = 100000
+
+
+class CalendarColumns(NamedTuple):
+    """The columns of calendars laid end to end, as NumPy arrays."""
+
+    dates: np.ndarray
+    daily_prices: np.ndarray
+    min_nights: np.ndarray
+    availabilities: np.ndarray
+    checkin_days: np.ndarray
+    checkout_days: np.ndarray
+    # True on the first day of every calendar.
+    starts: np.ndarray
+
+
+class CalendarRule(NamedTuple):
+    name: str
+    message: str
+    # Returns a mask of the offending days.
+    check: Callable[[CalendarColumns, dict], np.ndarray]
+
+
+class RuleViolation(NamedTuple):
+    rule: str
+    message: str
+    count: int
+    # (first index, last index) of the runs of consecutive offending days.
+    ranges: List[Tuple[int, int]]
+
+
+def _date_steps(columns: CalendarColumns) -> np.ndarray:
+    """Returns the days between every day and the day before it, 1 for the
+    first day of every calendar and for missing dates."""
+    steps = np.ones(len(columns.dates), dtype=np.int64)
+    steps[1:] = np.diff(columns.dates.astype(np.int64))
+    known = columns.dates != MISSING_DATE
+    known[1:] &= known[:-1]
+    steps[columns.starts | ~known] = 1
+    return steps
+
+
+RULES = [
+    CalendarRule(
+        "dates_in_order",
+        "Dates are duplicated or not in ascending order",
+        lambda columns, options: _date_steps(columns) < 1,
+    ),
+    CalendarRule(
+        "dates_contiguous",
+        "Days are missing before these dates",
+        lambda columns, options: _date_steps(columns) > 1,
+    ),
+    CalendarRule(
+        "daily_price_positive",
+        "dailyPrice is not positive",
+        lambda columns, options: columns.daily_prices <= 0,
+    ),
+    CalendarRule(
+        "daily_price_bounded",
+        "dailyPrice is higher than {max_daily_price}",
+        lambda columns, options: columns.daily_prices > options["max_daily_price"],
+    ),
+    CalendarRule(
+        "min_nights_positive",
+        "minNights is lower than 1",
+        lambda columns, options: (columns.min_nights < 1)
+        & (columns.min_nights != MISSING_MIN_NIGHTS),
+    ),
+    CalendarRule(
+        "checkin_day_when_available",
+        "Available days have no checkinDays",
+        lambda columns, options: (
+            columns.availabilities == AVAILABILITY_CODES["available"]
+        )
+        & (columns.checkin_days == 0),
+    ),
+]
+
+
+def calendar_columns(store: CalendarStore) -> Tuple[List[str], CalendarColumns]:
+    """Lays the calendars of `store` end to end, returning their listing IDs
+    and their columns."""
+    listing_ids = list(store)
+    calendars = [store[listing_id] for listing_id in listing_ids]
+
+    def column(name, dtype):
+        arrays = [
+            np.frombuffer(getattr(calendar, name), dtype) for calendar in calendars
+        ]
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype)
+
+    lengths = np.array([len(calendar) for calendar in calendars], dtype=np.int64)
+    starts = np.zeros(int(lengths.sum()), dtype=bool)
+    starts[(np.cumsum(lengths) - lengths)[lengths > 0]] = True
+    columns = CalendarColumns(
+        dates=column("dates", np.int32),
+        daily_prices=column("daily_prices", np.float64),
+        min_nights=column("min_nights", np.int32),
+        availabilities=column("availabilities", np.int8),
+        checkin_days=column("checkin_days", np.uint8),
+        checkout_days=column("checkout_days", np.uint8),
+        starts=starts,
+    )
+    return listing_ids, columns
+
+
+def _ranges(indices: np.ndarray) -> List[Tuple[int, int]]:
+    """Groups sorted indices in runs of consecutive indices."""
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    firsts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    lasts = np.concatenate((indices[breaks], [indices[-1]]))
+    return list(zip(firsts.tolist(), lasts.tolist()))
+
+
+def evaluate_rules(
+    store: CalendarStore,
+    rules: List[CalendarRule] = RULES,
+    max_daily_price: float = DEFAULT_MAX_DAILY_PRICE,
+) -> Dict[str, List[RuleViolation]]:
+    """Evaluates `rules` on every calendar of `store` at once, returning the
+    violations of every listing breaking a rule, with the indices of the
+    offending days in its calendar."""
+    listing_ids, columns = calendar_columns(store)
+    offsets = np.cumsum([0] + [len(store[listing_id]) for listing_id in listing_ids])
+    options = {"max_daily_price": max_daily_price}
+
+    violations = {}
+    for rule in rules:
+        indices = np.flatnonzero(rule.check(columns, options))
+        if not len(indices):
+            continue
+        # Split the offending days by calendar.
+        calendars = np.searchsorted(offsets, indices, side="right") - 1
+        bounds = np.flatnonzero(np.diff(calendars)) + 1
+        for calendar_indices, owners in zip(
+            np.split(indices, bounds), np.split(calendars, bounds)
+        ):
+            calendar = owners[0]
+            local_indices = calendar_indices - offsets[calendar]
+            violations.setdefault(listing_ids[calendar], []).append(
+                RuleViolation(
+                    rule=rule.name,
+                    message=rule.message.format(**options),
+                    count=len(local_indices),
+                    ranges=_ranges(local_indices),
+                )
+            )
+    return violations
+
+
+def describe_range(dates, first: int, last: int) -> str:
+    """Describes the days from index `first` to `last` of a calendar, by date
+    when known."""
+
+    def describe(index):
+        if dates[index] == MISSING_DATE:
+            return f"$[{index}]"
+        return datetime.date.fromordinal(dates[index]).isoformat()
+
+    if first == last:
+        return describe(first)
+    return f"{describe(first)} to {describe(last)}"
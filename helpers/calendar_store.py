@@ -0,0 +1,166 @@
+import datetime
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, List
+
+from schemas import calendar_schema
+
+_day_properties = calendar_schema["items"]["properties"]
+AVAILABILITIES = _day_properties["availability"]["enum"]
+DAYS_OF_WEEK = _day_properties["checkinDays"]["items"]["enum"]
+AVAILABILITY_CODES = {
+    availability: code for code, availability in enumerate(AVAILABILITIES)
+}
+DAY_BITS = {day: 1 << index for index, day in enumerate(DAYS_OF_WEEK)}
+# Stored in place of values missing from a day or not matching the schema.
+MISSING_DATE = 0
+MISSING_PRICE = math.nan
+MISSING_MIN_NIGHTS = -(2**31)
+MISSING_AVAILABILITY = -1
+
+
+def _date_ordinal(value) -> int:
+    try:
+        return datetime.date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return MISSING_DATE
+
+
+def _price(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return MISSING_PRICE
+    return value
+
+
+def _min_nights(value) -> int:
+    # Bounded by the 32 bit integers of the column, minus the missing value.
+    if isinstance(value, bool) or not isinstance(value, int):
+        return MISSING_MIN_NIGHTS
+    if not MISSING_MIN_NIGHTS < value < 2**31:
+        return MISSING_MIN_NIGHTS
+    return value
+
+
+def _day_bits(days) -> int:
+    if not isinstance(days, list):
+        return 0
+    bits = 0
+    for day in days:
+        bits |= DAY_BITS.get(day, 0) if isinstance(day, str) else 0
+    return bits
+
+
+def _days_of_week(bits: int) -> List[str]:
+    return [day for day, bit in DAY_BITS.items() if bits & bit]
+
+
+class CompactCalendar():
+    """A calendar stored column by column in typed arrays, instead of as one
+    dict per day.
+
+    Dates are kept as ordinals, availabilities as their index in the schema's
+    enum and check-in and checkout days as bitmasks, bit `n` standing for the
+    `n`th day of `DAYS_OF_WEEK`. Values missing from a day or not matching
+    `calendar_schema` are stored as the `MISSING_*` constants, so calendars
+    are stored whether they are valid or not.
+    """
+
+    __slots__ = (
+        "dates",
+        "daily_prices",
+        "min_nights",
+        "availabilities",
+        "checkin_days",
+        "checkout_days",
+    )
+
+    def __init__(self) -> None:
+        self.dates = array("i")
+        self.daily_prices = array("d")
+        self.min_nights = array("i")
+        self.availabilities = array("b")
+        self.checkin_days = array("B")
+        self.checkout_days = array("B")
+
+    @classmethod
+    def from_payload(cls, days: Iterable[dict]) -> "CompactCalendar":
+        """Builds a calendar from the days of a calendar payload, read once so
+        they can be streamed."""
+        calendar = cls()
+        for day in days:
+            calendar.append(day)
+        return calendar
+
+    def append(self, day: dict) -> None:
+        if not isinstance(day, dict):
+            day = {}
+        self.dates.append(_date_ordinal(day.get("date")))
+        self.daily_prices.append(_price(day.get("dailyPrice")))
+        self.min_nights.append(_min_nights(day.get("minNights")))
+        self.availabilities.append(
+            AVAILABILITY_CODES.get(day.get("availability"), MISSING_AVAILABILITY)
+        )
+        self.checkin_days.append(_day_bits(day.get("checkinDays")))
+        self.checkout_days.append(_day_bits(day.get("checkoutDays")))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: int) -> dict:
+        """Returns the `index`th day as in the payload, prices as floats,
+        without the values that were missing or invalid."""
+        day = {}
+        if self.dates[index] != MISSING_DATE:
+            day["date"] = datetime.date.fromordinal(self.dates[index]).isoformat()
+        if not math.isnan(self.daily_prices[index]):
+            day["dailyPrice"] = self.daily_prices[index]
+        if self.availabilities[index] != MISSING_AVAILABILITY:
+            day["availability"] = AVAILABILITIES[self.availabilities[index]]
+        if self.min_nights[index] != MISSING_MIN_NIGHTS:
+            day["minNights"] = self.min_nights[index]
+        day["checkinDays"] = _days_of_week(self.checkin_days[index])
+        day["checkoutDays"] = _days_of_week(self.checkout_days[index])
+        return day
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self[index] for index in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            len(column) * column.itemsize
+            for column in (getattr(self, name) for name in self.__slots__)
+        )
+
+
+class CalendarStore():
+    """Compact calendars of many listings, keyed by listing ID."""
+
+    def __init__(self) -> None:
+        self._calendars: Dict[str, CompactCalendar] = {}
+
+    def add(self, listing_id: str, days: Iterable[dict]) -> CompactCalendar:
+        calendar = self._calendars[listing_id] = CompactCalendar.from_payload(days)
+        return calendar
+
+    def __getitem__(self, listing_id: str) -> CompactCalendar:
+        return self._calendars[listing_id]
+
+    def __setitem__(self, listing_id: str, calendar: CompactCalendar) -> None:
+        self._calendars[listing_id] = calendar
+
+    def __contains__(self, listing_id: str) -> bool:
+        return listing_id in self._calendars
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._calendars)
+
+    def __len__(self) -> int:
+        return len(self._calendars)
+
+    def items(self):
+        return self._calendars.items()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(calendar.nbytes for calendar in self._calendars.values())
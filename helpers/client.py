@@ -1,14 +1,49 @@
-from typing import Dict, List
-from requests import request
+import datetime
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from functools import partial
+from typing import Callable, Dict, List
+from requests import Session
+from requests.exceptions import ReadTimeout, RequestException
+from urllib3.response import HTTPResponse
 from .exceptions import (
     BadRequest,
+    DeadlineExceeded,
     InternalServerError,
     InvalidCredentials,
     PropertyNotFound,
     PostingRatesError,
+    RateLimited,
     ReservationNotFound,
     StatusCodeException
 )
+from .cache import ResponseCache
+from .metrics import RequestMetrics
+from .rate_limiter import RateLimiter, parse_retry_after
+from .recording import Recorder
+from .streaming import iter_json_array
+from .transport import DEFAULT_POOL_MAXSIZE, build_session, pop_connect_time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, decode with the stdlib without it.
+    orjson = None
+
+# Decoders take the raw, decompressed body of a response, and raise a
+# `json.JSONDecodeError` on invalid JSON.
+DEFAULT_JSON_DECODER = orjson.loads if orjson is not None else json.loads
+# Timeout of the requests to routes missing from `ROUTE_TIMEOUTS`.
+DEFAULT_TIMEOUT = 300
+# GETs are hedged once they take longer than this quantile of the route's
+# latency, when at least HEDGE_MIN_SAMPLES requests to the route were observed.
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+# Seconds the hedging threshold of a route is reused before the quantile is
+# computed again from the route's latency.
+HEDGE_THRESHOLD_TTL = 5.0
 
 
 class DynamicAPIClient():
@@ -20,14 +55,64 @@ class DynamicAPIClient():
         "PATH_LISTING_RESERVATION": "/listings/{listing_id}/reservations",
         "PATH_RESERVATION": "/reservations/{reservation_id}",
     }
-    ALLOWED_STATUS_CODES = (200, 400, 500, 201, 404, 401)
+    # Seconds each request to the route may take, keyed by `ROUTES` names.
+    ROUTE_TIMEOUTS = {
+        "PATH_ACCOUNT": 30,
+        "PATH_LISTINGS": 60,
+        "PATH_LISTING": 30,
+        "PATH_CALENDAR": 120,
+        "PATH_LISTING_RESERVATION": 120,
+        "PATH_RESERVATION": 30,
+    }
+    ALLOWED_STATUS_CODES = (200, 400, 500, 201, 404, 401, 304)
+    STREAM_CHUNK_SIZE = 64 * 1024
 
-    def __init__(self, api_key, base_url) -> None:
+    def __init__(
+        self,
+        api_key,
+        base_url,
+        session: Session = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        cache: ResponseCache = None,
+        metrics: RequestMetrics = None,
+        recorder: Recorder = None,
+        rate_limiter: RateLimiter = None,
+        json_decoder: Callable[[bytes], object] = None,
+        timeouts: Dict[str, float] = None,
+        deadline: float = None,
+        hedge: bool = False,
+    ) -> None:
         self.api_key = api_key
         self.base_url = base_url
         self.allowed_status_codes = self.ALLOWED_STATUS_CODES
+        # Share `session` between clients hitting the same `base_url` to reuse
+        # their pooled keep-alive connections.
+        self.session = session or build_session(pool_maxsize=pool_maxsize)
+        self.cache = cache
+        self.metrics = metrics
+        # Pass a `ReplaySession` as `session` to replay what `recorder`
+        # recorded.
+        self.recorder = recorder
+        # Share `rate_limiter` between clients hitting the same `base_url`,
+        # see `get_rate_limiter`.
+        self.rate_limiter = rate_limiter
+        self.json_decoder = json_decoder or DEFAULT_JSON_DECODER
+        # Override `ROUTE_TIMEOUTS` per route.
+        self.timeouts = {**self.ROUTE_TIMEOUTS, **(timeouts or {})}
+        # `time.monotonic()` value after which requests raise
+        # `DeadlineExceeded` instead of being sent, see `run`'s `budget`.
+        self.deadline = deadline
+        # Hedge GETs slower than usual with a duplicate request, taking
+        # whichever answers first. Needs `metrics` to know what usual is.
+        self.hedge = hedge
+        self.pool_maxsize = pool_maxsize
+        self._last_responses = threading.local()
+        self._hedge_executor = None
+        self._hedge_executor_lock = threading.Lock()
+        # Route to its hedging threshold and when it was computed.
+        self._hedge_thresholds = {}
 
-    def _request(self, *args, headers=None, **kwargs):
+    def _request(self, method, headers=None, **kwargs):
         new_headers = {
             "x-api-key": self.api_key,
             "Accept": "application/json",
@@ -38,12 +123,58 @@ class DynamicAPIClient():
         else:
             headers = new_headers
         url = self.base_url + kwargs.pop("path")
-        response = request(headers=headers, url=url, *args, timeout=300, **kwargs)
+        route = kwargs.pop("route", None)
+        streamed = kwargs.get("stream", False)
+        for attempt in range(self._max_attempts()):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response, total_seconds, connect_seconds = self._send(
+                    method, url, headers, route, **kwargs
+                )
+            except RequestException as e:
+                # The timeout was cut short to fit in the run budget.
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    raise DeadlineExceeded(
+                        f"{self.base_url}: The run budget was exhausted while "
+                        f"requesting {route or 'the API'}"
+                    ) from e
+                raise
+            if self.metrics is not None and route is not None:
+                self._observe_request(
+                    route,
+                    response,
+                    total_seconds=total_seconds,
+                    connect_seconds=connect_seconds,
+                    streamed=streamed,
+                )
+            # Streamed bodies are recorded as they are read, see `_iter_items`.
+            if self.recorder is not None and not (
+                streamed and response.status_code == 200
+            ):
+                self.recorder.record(response)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(
+                    response.status_code,
+                    latency=response.elapsed.total_seconds(),
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+            if response.status_code != 429:
+                break
+            response.close()
+
+        if response.status_code == 429:
+            raise RateLimited(
+                f"{self.base_url}: Requests were still rate limited after "
+                f"{attempt + 1} attempts",
+                status_code=response.status_code,
+                response=response,
+            )
         if (
             response.status_code not in self.allowed_status_codes
         ):
             raise StatusCodeException(
-                message=f"{self._integration_name}: Response status code was "
+                f"{self.base_url}: Response status code was "
                 f"{response.status_code}, `allowed_status_codes` are:"
                 f" {self.allowed_status_codes}",
                 status_code=response.status_code,
@@ -65,58 +196,294 @@ class DynamicAPIClient():
 
         return response
 
+    def _max_attempts(self) -> int:
+        # Throttled requests are only retried when paced by a rate limiter.
+        if self.rate_limiter is None:
+            return 1
+        return 1 + self.rate_limiter.max_retries
+
+    def _timeout(self, route) -> float:
+        timeout = self.timeouts.get(route, DEFAULT_TIMEOUT)
+        if self.deadline is None:
+            return timeout
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(
+                f"{self.base_url}: The run budget was exhausted before "
+                f"requesting {route or 'the API'}"
+            )
+        return min(timeout, remaining)
+
+    def _send(self, method, url, headers, route, **kwargs):
+        """Sends the request, hedged when it is a slow GET, returning the
+        response, its total duration and the time spent connecting."""
+        timeout = self._timeout(route)
+        hedge_after = self._hedge_after(method, route, kwargs.get("stream", False))
+        if hedge_after is None:
+            return self._send_once(method, url, headers, timeout, route, **kwargs)
+
+        executor = self._hedging_executor()
+        started_at = time.perf_counter()
+        attempts = [
+            executor.submit(
+                self._send_once, method, url, headers, timeout, route, **kwargs
+            )
+        ]
+        # Seconds after the first attempt each attempt was sent.
+        sent_after = {attempts[0]: 0.0}
+        done, _ = wait(attempts, timeout=hedge_after)
+        if not done:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            attempts.append(
+                executor.submit(
+                    self._send_once, method, url, headers, timeout, route, **kwargs
+                )
+            )
+            sent_after[attempts[1]] = time.perf_counter() - started_at
+        # Take the first attempt answering, or raise the first error when
+        # both fail. The other attempt is left to complete in the background.
+        error = None
+        for attempt in as_completed(attempts):
+            try:
+                response, _, connect_seconds = attempt.result()
+            except Exception as e:
+                error = error or e
+                continue
+            # Latency is what the caller waited, from the first attempt on,
+            # not only the duration of the attempt answering.
+            response.elapsed += datetime.timedelta(seconds=sent_after[attempt])
+            return response, time.perf_counter() - started_at, connect_seconds
+        raise error
+
+    def _send_once(self, method, url, headers, timeout, route, **kwargs):
+        streamed = kwargs.pop("stream", False)
+        pop_connect_time()
+        started_at = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        # `timeout` only bounds each socket read, the body is read here to
+        # bound the whole request.
+        response = self.session.request(
+            method, headers=headers, url=url, timeout=timeout, stream=True, **kwargs
+        )
+        if not streamed:
+            response._content = b"".join(self._read_body(response, deadline, route))
+            response._content_consumed = True
+            # Returns the connection to the pool.
+            response.close()
+        return response, time.perf_counter() - started_at, pop_connect_time()
+
+    def _read_body(self, response, deadline, route):
+        """Yields the decoded body of `response` as it arrives, raising once
+        `deadline` passed, however slowly the body trickles in."""
+        raw = response.raw
+        if isinstance(raw, HTTPResponse) and hasattr(raw, "read1"):
+            # Returns what arrived instead of waiting for a whole chunk.
+            chunks = iter(
+                partial(raw.read1, self.STREAM_CHUNK_SIZE, decode_content=True), b""
+            )
+        else:
+            chunks = response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+        for chunk in chunks:
+            if time.monotonic() >= deadline:
+                response.close()
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    raise DeadlineExceeded(
+                        f"{self.base_url}: The run budget was exhausted while "
+                        f"reading {route or 'the API'}"
+                    )
+                raise ReadTimeout(
+                    f"{self.base_url}: {route or 'The API'} took longer than its "
+                    "timeout to answer"
+                )
+            yield chunk
+
+    def _hedge_after(self, method, route, streamed):
+        """Returns the seconds after which to hedge the request, or None not
+        to hedge it."""
+        # Only idempotent requests can be sent twice, and streamed bodies are
+        # still being read once the response is returned.
+        if not self.hedge or method != "GET" or streamed or route is None:
+            return None
+        if self.metrics is None:
+            return None
+        # The quantile sorts the route's samples, so it is only recomputed
+        # every HEDGE_THRESHOLD_TTL seconds.
+        now = time.monotonic()
+        cached = self._hedge_thresholds.get(route)
+        if cached is not None and now - cached[1] < HEDGE_THRESHOLD_TTL:
+            return cached[0]
+        hedge_after = self.metrics.quantile(
+            method,
+            route,
+            "total_seconds",
+            HEDGE_QUANTILE,
+            min_count=HEDGE_MIN_SAMPLES,
+        )
+        self._hedge_thresholds[route] = (hedge_after, now)
+        return hedge_after
+
+    def _hedging_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                # Every hedged request may run two attempts at once.
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=2 * self.pool_maxsize,
+                    thread_name_prefix="hedged-request",
+                )
+            return self._hedge_executor
+
+    def _observe_request(
+        self, route, response, total_seconds, connect_seconds, streamed=False
+    ):
+        observe = partial(self.metrics.observe, response.request.method, route)
+        observe("connect_seconds", connect_seconds)
+        # `elapsed` stops once the headers are parsed, before the body is read.
+        observe("ttfb_seconds", response.elapsed.total_seconds())
+        if streamed:
+            # The body has not been read yet.
+            return
+        observe("total_seconds", total_seconds)
+        observe("compressed_bytes", response.raw.tell())
+        observe("decompressed_bytes", len(response.content))
+
+    def last_response_content(self) -> bytes:
+        """Returns the raw body of the last JSON response decoded by this
+        thread."""
+        return self._last_responses.response.content
+
+    def _json(self, response, route):
+        self._last_responses.response = response
+        started_at = time.perf_counter()
+        # Decode the body bytes directly, `response.json()` first decodes
+        # them to text, guessing their encoding.
+        data = self.json_decoder(response.content)
+        if self.metrics is not None:
+            self.metrics.observe(
+                response.request.method,
+                route,
+                "json_decode_seconds",
+                time.perf_counter() - started_at,
+            )
+        return data
+
     def _get(self, **kwargs):
-        return self._request("GET", **kwargs)
+        if self.cache is None or kwargs.get("stream"):
+            return self._request("GET", **kwargs)
+
+        params = kwargs.get("params") or {}
+        key = (
+            self.api_key,
+            self.base_url + kwargs["path"],
+            tuple(sorted(params.items())),
+        )
+        cached = self.cache.get(key)
+        if cached is not None and self.cache.is_fresh(cached):
+            return cached.response
+
+        headers = {}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        response = self._request("GET", headers=headers, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(key)
+            return cached.response
+        if response.status_code == 200:
+            self.cache.set(key, response)
+        return response
 
     def _post(self, data, **kwargs):
         return self._request("POST", data=data, **kwargs)
 
+    def _iter_items(self, response, route):
+        # The body is read within the route's timeout, and the run budget.
+        deadline = time.monotonic() + self._timeout(route)
+        with response:
+            chunks = self._read_body(response, deadline, route)
+            if self.recorder is None:
+                yield from iter_json_array(chunks)
+                return
+            chunks = self.recorder.record_stream(response, chunks)
+            try:
+                yield from iter_json_array(chunks)
+            finally:
+                # Records the body before the response is closed.
+                chunks.close()
+
     def get_account_information(self):
         """Fetch account information."""
-        response = self._get(path=self.ROUTES["PATH_ACCOUNT"])
-        data = response.json()
+        response = self._get(path=self.ROUTES["PATH_ACCOUNT"], route="PATH_ACCOUNT")
+        data = self._json(response, route="PATH_ACCOUNT")
         return data
 
     def get_listing_ids(self):
         """Fetch all Listings."""
-        response = self._get(path=self.ROUTES["PATH_LISTINGS"])
-        data = response.json()
+        response = self._get(path=self.ROUTES["PATH_LISTINGS"], route="PATH_LISTINGS")
+        data = self._json(response, route="PATH_LISTINGS")
         return data
 
     def get_listing_by_id(self, listing_id):
         """Fetch a listing by Listing ID"""
         path = self.ROUTES["PATH_LISTING"].format(listing_id=listing_id)
-        response = self._get(path=path)
+        response = self._get(path=path, route="PATH_LISTING")
         if response.status_code == 404:
             raise PropertyNotFound(
                 f"Failed to get listing with id: {listing_id} with error response: {response.text}"
             )
-        data = response.json()
+        data = self._json(response, route="PATH_LISTING")
         return data
 
     def get_calendar_by_listing_id(self, listing_id):
         """Fetch calendar by Listing ID."""
         path = self.ROUTES["PATH_CALENDAR"].format(listing_id=listing_id)
-        response = self._get(path=path)
+        response = self._get(path=path, route="PATH_CALENDAR")
         if response.status_code == 404:
             raise PropertyNotFound(
                 f"Failed to get listing with id: {listing_id} with error response: {response.text}"
             )
 
-        data = response.json()
+        data = self._json(response, route="PATH_CALENDAR")
         return data
 
-    def post_rates(self, listing_id, rates: List[Dict]):
-        """Post rates information by Listing ID."""
+    def iter_calendar_by_listing_id(self, listing_id):
+        """Stream calendar days by Listing ID, one day at a time."""
         path = self.ROUTES["PATH_CALENDAR"].format(listing_id=listing_id)
-        response = self._post(path=path, data={}, json=rates)
+        response = self._get(path=path, stream=True, route="PATH_CALENDAR")
         if response.status_code == 404:
             raise PropertyNotFound(
                 f"Failed to get listing with id: {listing_id} with error response: {response.text}"
             )
-        if response.status_code == 400:
+        return self._iter_items(response, route="PATH_CALENDAR")
+
+    def post_rates(self, listing_id, rates: List[Dict], compress: bool = False):
+        """Post rates information by Listing ID.
+
+        With `compress`, the JSON body is sent gzip-compressed, which only
+        partners decoding `Content-Encoding: gzip` requests accept.
+        """
+        path = self.ROUTES["PATH_CALENDAR"].format(listing_id=listing_id)
+        try:
+            if compress:
+                response = self._post(
+                    path=path,
+                    data=gzip.compress(json.dumps(rates).encode()),
+                    headers={
+                        "Content-Type": "application/json",
+                        "Content-Encoding": "gzip",
+                    },
+                    route="PATH_CALENDAR",
+                )
+            else:
+                response = self._post(
+                    path=path, data={}, json=rates, route="PATH_CALENDAR"
+                )
+        except BadRequest as e:
             raise PostingRatesError(
-                "Failed to post rates with the error: {response.text}"
+                f"Failed to post rates to listing {listing_id}: {e}"
+            ) from e
+        if response.status_code == 404:
+            raise PropertyNotFound(
+                f"Failed to get listing with id: {listing_id} with error response: {response.text}"
             )
         return []
 
@@ -126,22 +493,40 @@ class DynamicAPIClient():
         params = dict()
         if checkin_start_date:
             params.update({"checkinStartDate": checkin_start_date.strftime("%Y-%m-%d")})
-        response = self._get(path=path, params=params)
+        response = self._get(
+            path=path, params=params, route="PATH_LISTING_RESERVATION"
+        )
 
         if response.status_code == 404:
             raise PropertyNotFound(
                 f"Failed to get listing with id: {listing_id} with error response: {response.text}"
             )
-        data = response.json()
+        data = self._json(response, route="PATH_LISTING_RESERVATION")
         return data
 
+    def iter_reservations_by_listing_id(self, listing_id, checkin_start_date=None):
+        """Stream reservations by Listing ID, one reservation at a time."""
+        path = self.ROUTES["PATH_LISTING_RESERVATION"].format(listing_id=listing_id)
+        params = dict()
+        if checkin_start_date:
+            params.update({"checkinStartDate": checkin_start_date.strftime("%Y-%m-%d")})
+        response = self._get(
+            path=path, params=params, stream=True, route="PATH_LISTING_RESERVATION"
+        )
+
+        if response.status_code == 404:
+            raise PropertyNotFound(
+                f"Failed to get listing with id: {listing_id} with error response: {response.text}"
+            )
+        return self._iter_items(response, route="PATH_LISTING_RESERVATION")
+
     def get_reservation(self, reservation_id):
         """Fetch a reservation by Reservation ID."""
         path = self.ROUTES["PATH_RESERVATION"].format(reservation_id=reservation_id)
-        response = self._get(path=path)
+        response = self._get(path=path, route="PATH_RESERVATION")
         if response.status_code == 404:
             raise ReservationNotFound(
                 f"Failed to get reservation with id: {reservation_id} with error response: {response.text}"
             )
-        data = response.json()
+        data = self._json(response, route="PATH_RESERVATION")
         return data
@@ -0,0 +1,191 @@
+import bisect
+import datetime
+import itertools
+from typing import Collection, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .streaming import tap
+
+# Reservations checking in up to this many nights before a calendar starts
+# can cover its first nights.
+DEFAULT_MAX_STAY_NIGHTS = 30
+
+
+class Stay(NamedTuple):
+    """The nights of a reservation, as date ordinals. The checkout day is not
+    a night of the stay."""
+
+    checkin: int
+    checkout: int
+    reservation_id: str
+
+
+class ConsistencyReport(NamedTuple):
+    # (reservation ID, listing ID) of the reservations of unknown listings.
+    unknown_listing_ids: List[Tuple[str, str]]
+    # (reservation ID, reservation ID) of overlapping accepted reservations.
+    overlapping_reservations: List[Tuple[str, str]]
+    # (first day, last day) of the booked days no accepted reservation covers.
+    uncovered_booked_days: List[Tuple[datetime.date, datetime.date]]
+
+    def __bool__(self) -> bool:
+        return not any(self._asdict().values())
+
+
+def _ordinal(value: str) -> Optional[int]:
+    # Malformed dates are reported by the schema checks.
+    try:
+        return datetime.date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class ReservationIndex():
+    """Interval index over the stays of a listing's accepted reservations.
+
+    Stays are sorted by checkin, alongside the latest checkout of every prefix
+    of them, so whether a night is covered is answered in O(log n) even when
+    stays overlap.
+    """
+
+    def __init__(self, stays: Iterable[Stay]) -> None:
+        self.stays = sorted(stays)
+        self._checkins = [stay.checkin for stay in self.stays]
+        self._latest_checkouts = list(
+            itertools.accumulate((stay.checkout for stay in self.stays), max)
+        )
+
+    def covers(self, night: int) -> bool:
+        index = bisect.bisect_right(self._checkins, night)
+        return index > 0 and self._latest_checkouts[index - 1] > night
+
+    def overlapping(self) -> List[Tuple[str, str]]:
+        """Returns the pairs of stays sharing a night, each stay paired with
+        the earlier stay checking out last."""
+        overlapping = []
+        latest = None
+        for stay in self.stays:
+            if latest is not None and stay.checkin < latest.checkout:
+                overlapping.append((latest.reservation_id, stay.reservation_id))
+            if latest is None or stay.checkout > latest.checkout:
+                latest = stay
+        return overlapping
+
+
+def _day_ranges(ordinals: List[int]) -> List[Tuple[datetime.date, datetime.date]]:
+    ranges = []
+    for ordinal in sorted(set(ordinals)):
+        if ranges and ranges[-1][1] == ordinal - 1:
+            ranges[-1][1] = ordinal
+        else:
+            ranges.append([ordinal, ordinal])
+    return [
+        (datetime.date.fromordinal(first), datetime.date.fromordinal(last))
+        for first, last in ranges
+    ]
+
+
+class ListingConsistency():
+    """Collects what the consistency check needs from a listing's calendar
+    and reservations while other checks read them, so they are not fetched
+    again.
+
+    Wrap the calendar days and reservations the checks iterate with
+    `read_calendar` and `read_reservations`. Only the booked nights, the
+    stays of accepted reservations and the reservations of unknown listings
+    are kept.
+    """
+
+    def __init__(self, listing_ids: Collection[str]) -> None:
+        if not isinstance(listing_ids, (set, frozenset)):
+            listing_ids = set(listing_ids)
+        self.listing_ids = listing_ids
+        # Whether the whole calendar, and reservations checking in since
+        # `reservations_start_date` (all of them when None), were read.
+        self.calendar_read = False
+        self.reservations_read = False
+        self.reservations_start_date = None
+        self.calendar_start = None
+        self._booked_nights = []
+        self._stays = []
+        self._unknown_listing_ids = []
+
+    def _observe_day(self, day) -> None:
+        if not isinstance(day, dict):
+            return
+        night = _ordinal(day.get("date"))
+        if night is None:
+            return
+        if self.calendar_start is None or night < self.calendar_start:
+            self.calendar_start = night
+        if day.get("availability") == "booked":
+            self._booked_nights.append(night)
+
+    def _observe_reservation(self, reservation) -> None:
+        if not isinstance(reservation, dict):
+            return
+        reservation_id = reservation.get("id")
+        listing_id = reservation.get("listingId")
+        if listing_id not in self.listing_ids:
+            self._unknown_listing_ids.append((reservation_id, listing_id))
+        if reservation.get("status") != "accepted":
+            return
+        checkin = _ordinal(reservation.get("checkinDate"))
+        checkout = _ordinal(reservation.get("checkoutDate"))
+        if checkin is not None and checkout is not None:
+            self._stays.append(Stay(checkin, checkout, reservation_id))
+
+    def _calendar_exhausted(self) -> None:
+        self.calendar_read = True
+
+    def _reservations_exhausted(self) -> None:
+        self.reservations_read = True
+
+    def read_calendar(self, days: Iterable[dict]) -> Iterator[dict]:
+        self.calendar_read = False
+        self.calendar_start = None
+        self._booked_nights = []
+        return tap(days, self._observe_day, self._calendar_exhausted)
+
+    def read_reservations(
+        self, reservations: Iterable[dict], checkin_start_date=None
+    ) -> Iterator[dict]:
+        """Wraps `reservations` fetched from `checkin_start_date`, or all of
+        them when None."""
+        self.reservations_read = False
+        self.reservations_start_date = checkin_start_date
+        self._stays = []
+        self._unknown_listing_ids = []
+        return tap(
+            reservations, self._observe_reservation, self._reservations_exhausted
+        )
+
+    def required_checkin_start_date(
+        self, max_stay_nights: int = DEFAULT_MAX_STAY_NIGHTS
+    ) -> Optional[datetime.date]:
+        """Returns the earliest check-in of the reservations that can cover a
+        night of the calendar, or None when its dates are unknown."""
+        if self.calendar_start is None:
+            return None
+        return datetime.date.fromordinal(self.calendar_start - max_stay_nights)
+
+    def has_reservations(
+        self, max_stay_nights: int = DEFAULT_MAX_STAY_NIGHTS
+    ) -> bool:
+        """Whether the reservations read cover the calendar's date range."""
+        if not self.reservations_read:
+            return False
+        if self.reservations_start_date is None:
+            return True
+        required = self.required_checkin_start_date(max_stay_nights)
+        return required is not None and self.reservations_start_date <= required
+
+    def report(self) -> ConsistencyReport:
+        index = ReservationIndex(self._stays)
+        uncovered = [
+            night for night in self._booked_nights if not index.covers(night)
+        ]
+        return ConsistencyReport(
+            unknown_listing_ids=list(self._unknown_listing_ids),
+            overlapping_reservations=index.overlapping(),
+            uncovered_booked_days=_day_ranges(uncovered),
+        )
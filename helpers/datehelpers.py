@@ -1,5 +1,6 @@
 from dateutil.relativedelta import relativedelta
-from datetime import datetime
+import datetime
+import pytz
 
 
 def utc_today(as_datetime=False):
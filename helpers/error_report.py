@@ -0,0 +1,86 @@
+from typing import List
+
+from jsonschema.exceptions import ValidationError
+
+DEFAULT_MAX_SAMPLES = 3
+# Keywords whose errors at one schema path differ by the property they name,
+# like the property `required` found missing. Their errors are also grouped
+# by message, so each missing property gets its own line.
+_PROPERTY_KEYWORDS = {
+    "required",
+    "dependentRequired",
+    "additionalProperties",
+    "unevaluatedProperties",
+}
+
+
+class ErrorGroup():
+    """Validation errors raised by the same keyword at the same schema path,
+    and about the same property, like a field missing from every day of a
+    calendar."""
+
+    def __init__(self, keyword: str, schema_path: str, message: str) -> None:
+        self.keyword = keyword
+        self.schema_path = schema_path
+        self.message = message
+        self.count = 0
+        self.samples = []
+
+
+class ErrorReport():
+    """Aggregates validation errors by schema path, validator keyword and,
+    for keywords naming properties, property, keeping their count and the JSON paths of the first `max_samples` of each.
+
+    Once `max_errors` errors were added, `add` returns False so callers can
+    stop validating.
+    """
+
+    def __init__(
+        self, max_errors: int = None, max_samples: int = DEFAULT_MAX_SAMPLES
+    ) -> None:
+        self.max_errors = max_errors
+        self.max_samples = max_samples
+        self.count = 0
+        self._groups = {}
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.max_errors is not None and self.count >= self.max_errors
+
+    def add(self, error: ValidationError, json_path: str = None) -> bool:
+        """Adds `error`, found at `json_path` if given, and returns whether
+        more errors should be added."""
+        schema_path = "#/" + "/".join(str(part) for part in error.schema_path)
+        detail = error.message if error.validator in _PROPERTY_KEYWORDS else ""
+        key = (schema_path, error.validator, detail)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = ErrorGroup(
+                error.validator, schema_path, error.message
+            )
+        group.count += 1
+        if len(group.samples) < self.max_samples:
+            group.samples.append(json_path or error.json_path)
+        self.count += 1
+        return not self.truncated
+
+    def lines(self) -> List[str]:
+        lines = []
+        for key in sorted(self._groups):
+            group = self._groups[key]
+            if group.count == 1:
+                lines.append(f"    - {group.samples[0]} - {group.message}")
+                continue
+            paths = ", ".join(group.samples)
+            if group.count > len(group.samples):
+                paths += f" and {group.count - len(group.samples)} more"
+            lines.append(
+                f"    - {paths} - {group.message} "
+                f"({group.count} `{group.keyword}` errors at {group.schema_path})"
+            )
+        if self.truncated:
+            lines.append(f"    - Stopped validating after {self.count} errors")
+        return lines
@@ -25,12 +25,29 @@ class PropertyNotFound(Exception):
     pass
 
 
-class PostingRatesError(Exception):
-    pass
+class PostingRatesError(BadRequest):
+    """A 400 answering rates posted to a listing's calendar."""
 
 
 class ReservationNotFound(Exception):
     pass
 
 class StatusCodeException(Exception):
-    pass
\ No newline at end of file
+    def __init__(self, message, status_code=None, response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+class RateLimited(StatusCodeException):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+class DependencyError(Exception):
+    pass
+
+class RecordingNotFound(Exception):
+    pass
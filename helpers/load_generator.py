@@ -0,0 +1,183 @@
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from .client import DynamicAPIClient
+from .metrics import Histogram
+
+def _get_listing(client: DynamicAPIClient, listing_id: str, rates: List[Dict]):
+    client.get_listing_by_id(listing_id)
+
+
+def _get_calendar(client: DynamicAPIClient, listing_id: str, rates: List[Dict]):
+    client.get_calendar_by_listing_id(listing_id)
+
+
+def _get_reservations(client: DynamicAPIClient, listing_id: str, rates: List[Dict]):
+    client.get_reservations_by_listing_id(listing_id)
+
+
+def _post_rates(client: DynamicAPIClient, listing_id: str, rates: List[Dict]):
+    client.post_rates(listing_id, rates)
+
+
+# Calls replayed by the load generator, and their weight in the default mix.
+OPERATIONS = {
+    "get_listing": _get_listing,
+    "get_calendar": _get_calendar,
+    "get_reservations": _get_reservations,
+    "post_rates": _post_rates,
+}
+DEFAULT_MIX = {
+    "get_listing": 4,
+    "get_calendar": 3,
+    "get_reservations": 2,
+    "post_rates": 1,
+}
+DEFAULT_MAX_WORKERS = 256
+DEFAULT_SLO_SECONDS = 1.0
+DEFAULT_SLO_TARGET = 0.99
+
+
+def scheduled_offsets(duration: float, rps: float, end_rps: float = None):
+    """Returns the offsets, in seconds from the start, at which requests are
+    sent to hold `rps` requests per second, or to ramp linearly from `rps` to
+    `end_rps` over `duration` seconds.
+
+    Raises a `ValueError` when `duration` is not positive, a rate is negative
+    or no request would ever be sent."""
+    if end_rps is None:
+        end_rps = rps
+    if duration <= 0:
+        raise ValueError(f"duration must be positive, got {duration}")
+    if rps < 0 or end_rps < 0:
+        raise ValueError(f"Rates must not be negative, got {rps} and {end_rps}")
+    if rps == end_rps == 0:
+        raise ValueError("rps must be positive when it does not ramp up")
+    return _offsets(duration, rps, end_rps)
+
+
+def _offsets(duration: float, rps: float, end_rps: float):
+    # Requests sent after t seconds: n(t) = rps * t + slope * t² / 2, solved
+    # for t at every integer n.
+    slope = (end_rps - rps) / duration
+    index = 0
+    while True:
+        if slope:
+            discriminant = rps * rps + 2 * slope * index
+            if discriminant < 0:
+                # Ramping down, the rate reached zero.
+                return
+            offset = (-rps + math.sqrt(discriminant)) / slope
+        else:
+            offset = index / rps
+        if offset >= duration:
+            return
+        yield offset
+        index += 1
+
+
+class LoadTestResult():
+    """Latencies, errors by exception class and SLO compliance per
+    operation."""
+
+    def __init__(self, slo_seconds: float = DEFAULT_SLO_SECONDS) -> None:
+        self.slo_seconds = slo_seconds
+        self.latencies = defaultdict(Histogram)
+        self.errors = defaultdict(Counter)
+        self.within_slo = Counter()
+        self.sent = 0
+        # Seconds spent sending requests on schedule, then until the last
+        # one completed.
+        self.send_elapsed = 0.0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, latency: float, error: Exception = None):
+        with self._lock:
+            self.latencies[operation].observe(latency)
+            if error is not None:
+                self.errors[operation][type(error).__name__] += 1
+            elif latency <= self.slo_seconds:
+                self.within_slo[operation] += 1
+
+    def summary(self) -> dict:
+        operations = {}
+        for operation, histogram in sorted(self.latencies.items()):
+            errors = sum(self.errors[operation].values())
+            operations[operation] = {
+                "requests": histogram.count,
+                "error_rate": errors / histogram.count,
+                "errors": dict(self.errors[operation]),
+                "slo_compliance": self.within_slo[operation] / histogram.count,
+                "latency": histogram.summary(),
+            }
+        completed = sum(histogram.count for histogram in self.latencies.values())
+        return {
+            "sent": self.sent,
+            "sent_rps": self.sent / self.send_elapsed if self.send_elapsed else 0.0,
+            "completed": completed,
+            "elapsed_seconds": self.elapsed,
+            "throughput_rps": completed / self.elapsed if self.elapsed else 0.0,
+            "slo_seconds": self.slo_seconds,
+            "slo_compliance": (
+                sum(self.within_slo.values()) / completed if completed else 0.0
+            ),
+            "operations": operations,
+        }
+
+
+def run_load(
+    client: DynamicAPIClient,
+    listing_ids: List[str],
+    rates: List[Dict],
+    duration: float,
+    rps: float,
+    end_rps: float = None,
+    mix: Dict[str, float] = DEFAULT_MIX,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    slo_seconds: float = DEFAULT_SLO_SECONDS,
+    seed: int = None,
+) -> LoadTestResult:
+    """Sends the operations of `mix`, picked by weight on random listings, at
+    a fixed or linearly ramping rate for `duration` seconds.
+
+    Scheduling is open-loop: requests are sent on schedule whether or not
+    earlier ones have completed, and latency is measured from the scheduled
+    send time, so a slow partner cannot slow the load down and hide its own
+    latency.
+    """
+    randomizer = random.Random(seed)
+    operations = list(mix)
+    weights = [mix[operation] for operation in operations]
+    result = LoadTestResult(slo_seconds=slo_seconds)
+
+    def send(operation, listing_id, scheduled_at):
+        error = None
+        try:
+            OPERATIONS[operation](client, listing_id, rates)
+        except Exception as e:
+            error = e
+        result.record(operation, time.perf_counter() - scheduled_at, error)
+
+    offsets = scheduled_offsets(duration, rps, end_rps)
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for offset in offsets:
+            scheduled_at = started_at + offset
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            operation = randomizer.choices(operations, weights)[0]
+            listing_id = randomizer.choice(listing_ids)
+            executor.submit(send, operation, listing_id, scheduled_at)
+            result.sent += 1
+        # The schedule spans `duration` seconds, longer if sending fell
+        # behind it, not the wait for the requests still in flight.
+        result.send_elapsed = max(duration, time.perf_counter() - started_at)
+    result.elapsed = time.perf_counter() - started_at
+    return result
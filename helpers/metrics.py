@@ -0,0 +1,135 @@
+import json
+import os
+import random
+import threading
+from collections import defaultdict
+
+DEFAULT_MAX_SAMPLES = 10000
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Metrics recorded for every request, and their help text once exported.
+METRICS = {
+    "connect_seconds": "Time spent opening connections (TCP and TLS handshakes).",
+    "ttfb_seconds": "Time from sending the request to receiving the headers.",
+    "total_seconds": "Time from sending the request to reading the whole body.",
+    "compressed_bytes": "Response body size on the wire.",
+    "decompressed_bytes": "Response body size once decompressed.",
+    "json_decode_seconds": "Time spent decoding the JSON body.",
+}
+PROMETHEUS_PREFIX = "beyond_validator_request_"
+
+
+class Histogram():
+    """Count, sum and a uniform sample of at most `max_samples` observed values,
+    from which quantiles are estimated."""
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES) -> None:
+        self.max_samples = max_samples
+        self.count = 0
+        self.sum = 0.0
+        self.samples = []
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if len(self.samples) < self.max_samples:
+            self.samples.append(value)
+            return
+        # Reservoir sampling keeps every observed value equally likely to be
+        # in the sample.
+        index = random.randrange(self.count)
+        if index < self.max_samples:
+            self.samples[index] = value
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def summary(self) -> dict:
+        summary = {"count": self.count, "sum": self.sum}
+        for q in QUANTILES:
+            summary[f"p{int(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+class RequestMetrics():
+    """Thread-safe latency and payload size histograms, per HTTP method and
+    route of `DynamicAPIClient.ROUTES`."""
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES) -> None:
+        self._histograms = defaultdict(
+            lambda: {metric: Histogram(max_samples) for metric in METRICS}
+        )
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, metric: str, value: float) -> None:
+        with self._lock:
+            self._histograms[(route, method)][metric].observe(value)
+
+    def quantile(
+        self, method: str, route: str, metric: str, q: float, min_count: int = 1
+    ):
+        """Returns the `q` quantile of `metric`, or None when fewer than
+        `min_count` values were observed."""
+        with self._lock:
+            histograms = self._histograms.get((route, method))
+            if histograms is None or histograms[metric].count < min_count:
+                return None
+            return histograms[metric].quantile(q)
+
+    def summary(self) -> dict:
+        """Returns `{route: {method: {metric: {count, sum, p50, p95, p99}}}}`."""
+        summary = defaultdict(dict)
+        with self._lock:
+            for (route, method), histograms in sorted(self._histograms.items()):
+                summary[route][method] = {
+                    metric: histogram.summary()
+                    for metric, histogram in histograms.items()
+                    if histogram.count
+                }
+        return dict(summary)
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Returns the histograms as Prometheus summaries, in the text
+        exposition format."""
+        summary = self.summary()
+        lines = []
+        for metric, help_text in METRICS.items():
+            name = PROMETHEUS_PREFIX + metric
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for route, methods in summary.items():
+                for method, metrics in methods.items():
+                    if metric not in metrics:
+                        continue
+                    values = metrics[metric]
+                    labels = f'route="{route}",method="{method}"'
+                    for q in QUANTILES:
+                        lines.append(
+                            f'{name}{{{labels},quantile="{q}"}} '
+                            f'{values[f"p{int(q * 100)}"]}'
+                        )
+                    lines.append(f"{name}_sum{{{labels}}} {values['sum']}")
+                    lines.append(f"{name}_count{{{labels}}} {values['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str) -> None:
+        _write_atomically(path, self.to_json())
+
+    def write_prometheus_textfile(self, path: str) -> None:
+        """Writes the metrics where the node exporter textfile collector can
+        pick them up. The file is replaced atomically, so the collector never
+        reads a partial file."""
+        _write_atomically(path, self.to_prometheus())
+
+
+def _write_atomically(path: str, content: str) -> None:
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as f:
+        f.write(content)
+    os.replace(temporary_path, path)
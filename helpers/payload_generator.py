@@ -0,0 +1,230 @@
+import datetime
+import json
+import random
+import string
+from typing import Iterable, Iterator, List, NamedTuple
+
+from jsonschema import Draft202012Validator
+
+DEFAULT_ARRAY_LENGTH = 3
+_EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+_ALPHABET = string.ascii_lowercase + string.digits
+
+
+def _date(rng: random.Random) -> str:
+    return (_EPOCH + datetime.timedelta(days=rng.randrange(3650))).date().isoformat()
+
+
+def _date_time(rng: random.Random) -> str:
+    timestamp = _EPOCH + datetime.timedelta(seconds=rng.randrange(3650 * 86400))
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _uri(rng: random.Random) -> str:
+    return f"https://example.com/{rng.randrange(10**6)}.jpg"
+
+
+# Values matching each format, and values not matching it.
+_FORMATS = {"date": _date, "date-time": _date_time, "uri": _uri}
+_MALFORMED = {
+    "date": "2025-02-30",
+    "date-time": "2025-01-01 25:00",
+    "uri": "not a uri",
+}
+# Values of the wrong type for each JSON type.
+_WRONG_TYPES = {
+    "string": 12345,
+    "number": "12345",
+    "integer": 1.5,
+    "boolean": "true",
+    "object": "{}",
+    "array": "[]",
+}
+
+
+class SyntheticPayload(NamedTuple):
+    payload: object
+    # JSON paths of the values made invalid, and how, e.g. "$[3].date: format".
+    defects: List[str]
+
+
+class PayloadGenerator():
+    """Generates random payloads matching a schema of `schemas`, a share of
+    them made invalid on purpose.
+
+    `defect_rate` is the share of objects carrying one defect: payloads, or
+    the items of array payloads like calendars. A defect is a required
+    property removed, a value of the wrong type, outside its enum, not
+    matching its format or shorter than its minLength, so every defective
+    payload fails validation. Values only match the schema: dates are not
+    contiguous and reservations do not match calendars.
+    """
+
+    def __init__(
+        self,
+        schema: dict,
+        defect_rate: float = 0.0,
+        seed: int = 0,
+        array_length: int = DEFAULT_ARRAY_LENGTH,
+    ) -> None:
+        self.schema = schema
+        self.defect_rate = defect_rate
+        self.array_length = array_length
+        self._random = random.Random(seed)
+        self._checked_formats = set(Draft202012Validator.FORMAT_CHECKER.checkers)
+
+    def payload(self) -> SyntheticPayload:
+        """Returns a payload, an array of `array_length` items for array
+        schemas."""
+        if self.schema.get("type") != "array":
+            return self._object(self.schema, "$")
+        payload = []
+        defects = []
+        for item in self.iter_items(self.array_length):
+            payload.append(item.payload)
+            index = len(payload) - 1
+            defects.extend(f"$[{index}]{defect[1:]}" for defect in item.defects)
+        return SyntheticPayload(payload, defects)
+
+    def payloads(self, count: int) -> Iterator[SyntheticPayload]:
+        for _ in range(count):
+            yield self.payload()
+
+    def iter_items(self, count: int) -> Iterator[SyntheticPayload]:
+        """Yields `count` items of an array schema one at a time, so arrays
+        larger than memory can be streamed."""
+        item_schema = self.schema["items"]
+        unique_strings = (
+            self.schema.get("uniqueItems") and item_schema.get("type") == "string"
+        )
+        for index in range(count):
+            if unique_strings:
+                yield SyntheticPayload(f"{self._string(item_schema)}-{index}", [])
+            else:
+                yield self._object(item_schema, "$")
+
+    def _object(self, schema: dict, path: str) -> SyntheticPayload:
+        value = self._value(schema)
+        defects = []
+        if self._random.random() < self.defect_rate:
+            defect = self._add_defect(schema, value, path)
+            if defect is not None:
+                defects.append(defect)
+        return SyntheticPayload(value, defects)
+
+    def _value(self, schema: dict):
+        rng = self._random
+        if "oneOf" in schema:
+            branch = rng.choice(schema["oneOf"])
+            schema = {**{k: v for k, v in schema.items() if k != "oneOf"}, **branch}
+        if "const" in schema:
+            return schema["const"]
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+
+        schema_type = schema.get("type")
+        if schema_type == "object":
+            return {
+                name: self._value(property_schema)
+                for name, property_schema in schema.get("properties", {}).items()
+            }
+        if schema_type == "array":
+            items = schema.get("items", {})
+            if "enum" in items:
+                # Days of the week and the like, without duplicates.
+                return rng.sample(items["enum"], rng.randint(1, len(items["enum"])))
+            return [self._value(items) for _ in range(rng.randint(0, 3))]
+        if schema_type == "string":
+            if schema.get("format") in _FORMATS:
+                return _FORMATS[schema["format"]](rng)
+            return self._string(schema)
+        if schema_type == "number":
+            return round(rng.uniform(1, 1000), 2)
+        if schema_type == "integer":
+            return rng.randint(1, 10)
+        if schema_type == "boolean":
+            return rng.random() < 0.5
+        return None
+
+    def _string(self, schema: dict) -> str:
+        length = self._random.randint(max(1, schema.get("minLength", 0)), 12)
+        length = min(length, schema.get("maxLength", length))
+        return "".join(self._random.choices(_ALPHABET, k=length))
+
+    def _defect_sites(self, schema: dict, value, path: str, sites: list) -> None:
+        """Collects the `(container, key, schema, path, kinds)` values that
+        can be made invalid in `value`, and the ways to do it."""
+        if schema.get("type") == "object" and isinstance(value, dict):
+            required = set(schema.get("required", []))
+            for name, property_schema in schema.get("properties", {}).items():
+                if name not in value:
+                    continue
+                property_path = f"{path}.{name}"
+                kinds = self._kinds(property_schema)
+                if name in required:
+                    kinds.append("missing")
+                if kinds:
+                    sites.append((value, name, property_schema, property_path, kinds))
+                self._defect_sites(property_schema, value[name], property_path, sites)
+        elif schema.get("type") == "array" and isinstance(value, list):
+            items = schema.get("items", {})
+            for index, item in enumerate(value):
+                kinds = self._kinds(items)
+                if kinds:
+                    sites.append((value, index, items, f"{path}[{index}]", kinds))
+                self._defect_sites(items, item, f"{path}[{index}]", sites)
+
+    def _kinds(self, schema: dict) -> List[str]:
+        kinds = []
+        if schema.get("type") in _WRONG_TYPES or "oneOf" in schema:
+            kinds.append("type")
+        if "enum" in schema:
+            kinds.append("enum")
+        value_format = schema.get("format")
+        if value_format in _MALFORMED and value_format in self._checked_formats:
+            kinds.append("format")
+        if schema.get("minLength", 0) > 0:
+            kinds.append("minLength")
+        return kinds
+
+    def _add_defect(self, schema: dict, value, path: str) -> str:
+        """Makes one value of `value` invalid in place, returning its path and
+        the kind of defect, or None when nothing can be made invalid."""
+        sites = []
+        self._defect_sites(schema, value, path, sites)
+        if not sites:
+            return None
+        container, key, value_schema, value_path, kinds = self._random.choice(sites)
+        kind = self._random.choice(kinds)
+        if kind == "missing":
+            del container[key]
+        elif kind == "type":
+            # Values of a schema without a type, like a oneOf of consts, are
+            # replaced by an object, matching none of its branches.
+            container[key] = _WRONG_TYPES.get(value_schema.get("type"), {})
+        elif kind == "enum":
+            container[key] = "not-in-enum"
+        elif kind == "format":
+            container[key] = _MALFORMED[value_schema["format"]]
+        elif kind == "minLength":
+            container[key] = ""
+        return f"{value_path}: {kind}"
+
+
+def write_json_lines(path: str, payloads: Iterable[SyntheticPayload]) -> int:
+    """Writes `payloads` to `path`, one JSON document per line, returning the
+    number of bytes written."""
+    size = 0
+    with open(path, "w") as f:
+        for payload in payloads:
+            line = json.dumps(payload.payload) + "\n"
+            size += len(line)
+            f.write(line)
+    return size
+
+
+def read_json_lines(path: str, loads=json.loads) -> Iterator:
+    """Yields the JSON documents of `path` written by `write_json_lines`."""
+    with open(path, "rb") as f:
+        for line in f:
+            yield loads(line)
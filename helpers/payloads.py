@@ -0,0 +1,114 @@
+import datetime
+
+DAYS_OF_WEEK = [
+    "sunday",
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+]
+
+
+def listing_ids_payload(count=100):
+    return [f"listing-{index}" for index in range(count)]
+
+
+def account_payload():
+    return {"id": "account-1", "name": "Beyond Benchmarks"}
+
+
+def listing_payload(listing_id="listing-1"):
+    return {
+        "id": listing_id,
+        "accountId": "account-1",
+        "createdAt": "2024-01-01T10:00:00Z",
+        "updatedAt": "2024-06-01T10:00:00Z",
+        "title": "Beach house",
+        "bedrooms": 3,
+        "bathrooms": 2,
+        "minNights": 2,
+        "imageUrl": "https://example.com/image.jpg",
+        "images": ["https://example.com/image.jpg"],
+        "description": "A house on the beach.",
+        "isListed": True,
+        "currency": "USD",
+        "checkinDays": ["friday", "saturday"],
+        "checkoutDays": ["saturday", "sunday"],
+        "roomType": "entire_home",
+        "address": {
+            "street": "1 Ocean Drive",
+            "city": "Miami",
+            "state": "FL",
+            "country": "US",
+            "zipCode": "33139",
+            "latitude": "25.7617",
+            "longitude": "-80.1918",
+        },
+    }
+
+
+def calendar_payload(days=730, start=datetime.date(2025, 1, 1), reservations=None):
+    """Returns `days` calendar days. The nights of the `reservations` first
+    reservations of `reservation_list_payload` with the same `start`, or of all
+    of them, are booked."""
+    booked_days = days if reservations is None else 7 * reservations
+    return [
+        {
+            "date": (start + datetime.timedelta(days=day)).isoformat(),
+            "dailyPrice": 150 + day % 50,
+            "availability": (
+                "booked"
+                if day % 7 < 4 and day < booked_days
+                else ("available", "blocked")[day % 2]
+            ),
+            "minNights": 1 + day % 3,
+            "checkinDays": DAYS_OF_WEEK[: 1 + day % 7],
+            "checkoutDays": DAYS_OF_WEEK[day % 7 :],
+        }
+        for day in range(days)
+    ]
+
+
+def reservation_payload(
+    reservation_id="reservation-1",
+    listing_id="listing-1",
+    checkin_date=datetime.date(2025, 2, 1),
+    nights=4,
+):
+    return {
+        "id": reservation_id,
+        "listingId": listing_id,
+        "bookedAt": "2025-01-01T10:00:00Z",
+        "canceledAt": None,
+        "checkinDate": checkin_date.isoformat(),
+        "checkoutDate": (checkin_date + datetime.timedelta(days=nights)).isoformat(),
+        "amount": 600,
+        "cleaningFeeAmount": 50,
+        "taxes": 40,
+        "rentalAmount": 510,
+        "status": "accepted",
+        "isOwner": False,
+        "currency": "USD",
+        "guest": {"id": "guest-1", "firstName": "Ada", "lastName": "Lovelace"},
+        "adults": 2,
+        "children": 0,
+        "source": "airbnb",
+    }
+
+
+def reservation_list_payload(
+    count=200, listing_id="listing-1", start=datetime.date(2025, 1, 1)
+):
+    """Returns `count` back to back, non overlapping, weekly reservations. Their
+    IDs are `<listing_id>.<index>`."""
+    return [
+        reservation_payload(
+            f"{listing_id}.{index}",
+            listing_id,
+            checkin_date=start + datetime.timedelta(days=7 * index),
+            nights=4,
+        )
+        for index in range(count)
+    ]
@@ -0,0 +1,129 @@
+import asyncio
+import email.utils
+import threading
+import time
+from typing import Optional
+
+DEFAULT_RATE = 10.0
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_MAX_RATE = 100.0
+DEFAULT_MAX_RETRIES = 5
+# Rate decreases caused by requests sent at the same time count as one.
+DECREASE_INTERVAL = 1.0
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """Returns the seconds to wait from a `Retry-After` header, given either
+    as a number of seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimiter():
+    """Token bucket pacing the requests sent to one partner API, from any
+    number of threads and asyncio tasks.
+
+    The rate adapts to the partner: it grows by about `increase` requests per
+    second every second while requests succeed, and is multiplied by
+    `decrease_factor` on a 429, or when a response takes longer than
+    `target_latency` seconds if set. A 429 also pauses every request for its
+    `Retry-After` delay.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        burst: float = None,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        target_latency: float = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst or max(1.0, rate)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._decreased_at = float("-inf")
+
+    def _reserve(self) -> float:
+        """Takes a token and returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            # Tokens are lent ahead, so waiting requests are served in order.
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self.rate)
+            return max(delay, self._blocked_until - now)
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _decrease(self, now: float) -> None:
+        if now - self._decreased_at < DECREASE_INTERVAL:
+            return
+        self._decreased_at = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+    def update(
+        self, status_code: int, latency: float = None, retry_after: float = None
+    ) -> None:
+        """Adapts the rate to the response to a request sent after `acquire`."""
+        with self._lock:
+            now = time.monotonic()
+            if status_code == 429:
+                self._decrease(now)
+                pause = retry_after if retry_after is not None else 1 / self.rate
+                self._blocked_until = max(self._blocked_until, now + pause)
+                self._tokens = min(self._tokens, 0.0)
+            elif (
+                self.target_latency is not None
+                and latency is not None
+                and latency > self.target_latency
+            ):
+                self._decrease(now)
+            elif status_code < 500:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+
+# Maps base URL -> RateLimiter shared by every client of that partner.
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url: str, **kwargs) -> RateLimiter:
+    """Returns the rate limiter of the partner API at `base_url`, creating it
+    with `kwargs` the first time it is requested."""
+    with _rate_limiters_lock:
+        rate_limiter = _rate_limiters.get(base_url)
+        if rate_limiter is None:
+            rate_limiter = _rate_limiters[base_url] = RateLimiter(**kwargs)
+    return rate_limiter
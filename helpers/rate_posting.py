@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple
+
+from .client import DynamicAPIClient
+from .metrics import Histogram
+
+DEFAULT_CHUNK_SIZE = 90
+DEFAULT_MAX_IN_FLIGHT = 16
+
+
+class ChunkResult(NamedTuple):
+    listing_id: str
+    chunk_index: int
+    rates: int
+    latency: float
+    error: Exception = None
+
+
+class BulkPostingReport():
+    """Outcome of every chunk posted by `post_rates_in_bulk`."""
+
+    def __init__(self) -> None:
+        self.chunks: List[ChunkResult] = []
+        self._lock = threading.Lock()
+
+    def add(self, result: ChunkResult) -> None:
+        with self._lock:
+            self.chunks.append(result)
+
+    @property
+    def failures(self) -> List[ChunkResult]:
+        return [chunk for chunk in self.chunks if chunk.error is not None]
+
+    @property
+    def failed_listing_ids(self) -> List[str]:
+        return sorted({chunk.listing_id for chunk in self.failures})
+
+    def summary(self) -> dict:
+        latency = Histogram()
+        for chunk in self.chunks:
+            latency.observe(chunk.latency)
+        return {
+            "chunks": len(self.chunks),
+            "rates": sum(chunk.rates for chunk in self.chunks),
+            "failed_chunks": len(self.failures),
+            "failed_listings": len(self.failed_listing_ids),
+            "errors": dict(
+                Counter(type(chunk.error).__name__ for chunk in self.failures)
+            ),
+            "latency": latency.summary(),
+        }
+
+
+def chunk_rates(rates: List[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Splits `rates` in lists of at most `chunk_size` consecutive rates."""
+    return [
+        rates[start : start + chunk_size] for start in range(0, len(rates), chunk_size)
+    ]
+
+
+def post_rates_in_bulk(
+    client: DynamicAPIClient,
+    rates_by_listing: Dict[str, List[Dict]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    compress: bool = False,
+) -> BulkPostingReport:
+    """Posts the rates of every listing in chunks of `chunk_size` days, with
+    at most `max_in_flight` chunks being posted at a time.
+
+    A failing chunk (`PostingRatesError` on a 400, `RateLimited`, ...) is
+    recorded in the report and does not stop the other chunks. See
+    `DynamicAPIClient.post_rates` for `compress`.
+    """
+    report = BulkPostingReport()
+
+    def post(listing_id, chunk_index, rates):
+        error = None
+        started_at = time.perf_counter()
+        try:
+            client.post_rates(listing_id, rates, compress=compress)
+        except Exception as e:
+            error = e
+        report.add(
+            ChunkResult(
+                listing_id=listing_id,
+                chunk_index=chunk_index,
+                rates=len(rates),
+                latency=time.perf_counter() - started_at,
+                error=error,
+            )
+        )
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for listing_id, rates in rates_by_listing.items():
+            for chunk_index, chunk in enumerate(chunk_rates(rates, chunk_size)):
+                executor.submit(post, listing_id, chunk_index, chunk)
+    return report
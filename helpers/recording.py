@@ -0,0 +1,183 @@
+import datetime
+import hashlib
+import io
+import json
+import mmap
+import shutil
+import struct
+import tempfile
+import threading
+import zlib
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from requests import PreparedRequest, Request, Response
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import RecordingNotFound
+
+# An archive is the zlib-compressed bodies of the recorded responses, back to
+# back, followed by their zlib-compressed JSON index and a trailer holding the
+# offset of that index.
+MAGIC = b"BYNDREC1"
+_TRAILER = struct.Struct("<Q8s")
+# Bodies are stored decoded, and the headers describing their transfer would
+# not match them anymore.
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# Compressed bytes of a streamed body kept in memory before it is spooled to
+# a temporary file.
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def _key(request: PreparedRequest) -> str:
+    # Requests sent with another API key, like the 401 check, get other
+    # responses. Only a digest of the key is stored.
+    api_key = request.headers.get("x-api-key", "")
+    api_key_digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return f"{request.method} {request.url} {api_key_digest}"
+
+
+class Recorder():
+    """Records the responses received by `DynamicAPIClient` to a compressed
+    archive at `path`, to be served back by `ReplaySession`.
+
+    Bodies are written as responses arrive, the archive is only readable once
+    closed.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6) -> None:
+        self.path = path
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._index = defaultdict(list)
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+
+    def record(self, response: Response) -> None:
+        self._write(response, zlib.compress(response.content, self.compression_level))
+
+    def record_stream(
+        self, response: Response, chunks: Iterable[bytes]
+    ) -> Iterator[bytes]:
+        """Yields the body `chunks` of a streamed `response`, recording them as
+        they are read.
+
+        The compressed body is spooled to a temporary file past
+        SPOOL_MAX_SIZE bytes, then copied into the archive, so it is never
+        held whole in memory. When the stream is closed early, the rest of
+        the body is still read and recorded, for the whole response to be
+        replayed."""
+        compressor = zlib.compressobj(self.compression_level)
+        chunks = iter(chunks)
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            try:
+                for chunk in chunks:
+                    spool.write(compressor.compress(chunk))
+                    yield chunk
+            except GeneratorExit:
+                for chunk in chunks:
+                    spool.write(compressor.compress(chunk))
+                self._write_spooled(response, spool, compressor)
+                raise
+            self._write_spooled(response, spool, compressor)
+
+    def _write_spooled(self, response: Response, spool, compressor) -> None:
+        spool.write(compressor.flush())
+        spool.seek(0)
+        self._write(response, spool)
+
+    def _write(self, response: Response, body) -> None:
+        """Writes the compressed `body`, bytes or a binary file, and indexes
+        it."""
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in _SKIPPED_HEADERS
+        }
+        with self._lock:
+            offset = self._file.tell()
+            if isinstance(body, bytes):
+                self._file.write(body)
+            else:
+                shutil.copyfileobj(body, self._file)
+            self._index[_key(response.request)].append(
+                {
+                    "status": response.status_code,
+                    "headers": headers,
+                    "offset": offset,
+                    "length": self._file.tell() - offset,
+                }
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            index_offset = self._file.tell()
+            self._file.write(zlib.compress(json.dumps(self._index).encode()))
+            self._file.write(_TRAILER.pack(index_offset, MAGIC))
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplaySession():
+    """Stands in for the `requests.Session` of `DynamicAPIClient`, serving the
+    responses of an archive written by `Recorder` instead of sending requests.
+
+    The archive is memory-mapped and only its index is read upfront, a body is
+    decompressed when its response is replayed. Requests recorded several
+    times get their responses back in the order they were recorded, the last
+    one being repeated.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._archive = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._archive[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a recording archive")
+        index_offset, magic = _TRAILER.unpack(self._archive[-_TRAILER.size :])
+        if magic != MAGIC:
+            raise ValueError(f"{path} is truncated, was its recorder closed?")
+        self._index = json.loads(
+            zlib.decompress(self._archive[index_offset : -_TRAILER.size])
+        )
+        self._lock = threading.Lock()
+        self._replayed = defaultdict(int)
+
+    def request(self, method, url, params=None, headers=None, **kwargs) -> Response:
+        request = Request(method, url, params=params, headers=headers).prepare()
+        key = _key(request)
+        recordings = self._index.get(key)
+        if not recordings:
+            raise RecordingNotFound(f"No response was recorded for {request.url}")
+        with self._lock:
+            recording = recordings[min(self._replayed[key], len(recordings) - 1)]
+            self._replayed[key] += 1
+
+        offset = recording["offset"]
+        body = zlib.decompress(self._archive[offset : offset + recording["length"]])
+        response = Response()
+        response.status_code = recording["status"]
+        response.headers = CaseInsensitiveDict(recording["headers"])
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(0)
+        response.encoding = "utf-8"
+        return response
+
+    def close(self) -> None:
+        self._archive.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
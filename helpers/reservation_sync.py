@@ -0,0 +1,57 @@
+import datetime
+import json
+import os
+import threading
+
+from .datehelpers import utc_today
+
+# Reservations checking in this many days before the high-water mark are
+# fetched again, to pick up late modifications around the last sync.
+DEFAULT_LOOKBACK_DAYS = 1
+
+
+class HighWaterMarks():
+    """Per-listing date of the last successful reservations sync, persisted as
+    JSON at `path`.
+
+    The mark is the sync date rather than the latest check-in seen: a
+    reservation booked after a sync can check in before reservations already
+    seen, but never before the day it was booked.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self._marks = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._marks = {
+                    listing_id: datetime.date.fromisoformat(mark)
+                    for listing_id, mark in json.load(f).items()
+                }
+
+    def checkin_start_date(
+        self, listing_id: str, lookback_days: int = DEFAULT_LOOKBACK_DAYS
+    ):
+        """Returns the `checkinStartDate` to ask `listing_id` reservations
+        from, or None if the listing was never synced."""
+        with self._lock:
+            mark = self._marks.get(listing_id)
+        if mark is None:
+            return None
+        return mark - datetime.timedelta(days=lookback_days)
+
+    def advance(self, listing_id: str, mark: datetime.date = None) -> None:
+        with self._lock:
+            self._marks[listing_id] = mark or utc_today()
+
+    def save(self) -> None:
+        with self._lock:
+            marks = {
+                listing_id: mark.isoformat()
+                for listing_id, mark in self._marks.items()
+            }
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(marks, f, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.path)
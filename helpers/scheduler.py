@@ -0,0 +1,78 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from .exceptions import DependencyError
+
+
+class Task(NamedTuple):
+    """A unit of work for `run_tasks`.
+
+    `function` is called with the result of each task named in `requires`,
+    passed as a keyword argument named after that task. It also waits for the
+    tasks named in `after`, without receiving their results.
+    """
+
+    name: str
+    function: Callable
+    requires: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+
+
+def run_tasks(tasks: List[Task], max_workers: int = 8):
+    """Runs `tasks` on a thread pool, each one as soon as the tasks it requires
+    have finished, so the total time is that of the longest chain of
+    dependencies rather than the sum of all tasks.
+
+    Every task runs at most once, whatever the number of tasks requiring it.
+    Returns `(results, errors)`, mapping task names to their result or to the
+    exception they raised. Tasks requiring a failed task are not run and fail
+    with a `DependencyError`.
+    """
+    tasks_by_name = {task.name: task for task in tasks}
+    for task in tasks:
+        for name in task.requires + task.after:
+            if name not in tasks_by_name:
+                raise ValueError(f"Task {task.name!r} requires unknown task {name!r}")
+
+    results: Dict[str, object] = {}
+    errors: Dict[str, Exception] = {}
+    pending = list(tasks)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # A task failing because of a dependency can in turn fail the
+            # tasks requiring it, so go over the pending tasks until none
+            # of them changes state.
+            while True:
+                waiting = []
+                for task in pending:
+                    dependencies = task.requires + task.after
+                    failed = [name for name in dependencies if name in errors]
+                    if failed:
+                        errors[task.name] = DependencyError(
+                            f"Requires {', '.join(failed)}, which failed"
+                        )
+                    elif all(name in results for name in dependencies):
+                        kwargs = {name: results[name] for name in task.requires}
+                        running[executor.submit(task.function, **kwargs)] = task
+                    else:
+                        waiting.append(task)
+                stalled = len(waiting) == len(pending)
+                pending = waiting
+                if stalled:
+                    break
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    results[task.name] = future.result()
+                except Exception as e:
+                    errors[task.name] = e
+
+    for task in pending:
+        errors[task.name] = DependencyError("Has circular requirements")
+    return results, errors
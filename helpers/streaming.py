@@ -0,0 +1,94 @@
+import codecs
+import json
+import re
+from typing import Callable, Iterable, Iterator
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+_item_delimiter = re.compile(r"[ \t\n\r]*[,\]]")
+
+# What the parser expects next while walking the top-level array.
+_OPENING_BRACKET = "["
+_FIRST_ITEM = "first item"
+_SEPARATOR = ","
+_ITEM = "item"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """Yields the items of the JSON array encoded in `chunks` one at a time.
+
+    Only the item being decoded and the unread part of the current chunk are
+    kept in memory, so the size of the whole array does not matter.
+    Raises `json.JSONDecodeError` if the document is not a JSON array.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    end_of_stream = False
+    expecting = _OPENING_BRACKET
+
+    while True:
+        position = _whitespace.match(buffer, position).end()
+        if position < len(buffer):
+            char = buffer[position]
+            if expecting == _OPENING_BRACKET:
+                if char != "[":
+                    raise json.JSONDecodeError("Expecting '['", buffer, position)
+                position += 1
+                expecting = _FIRST_ITEM
+                continue
+            if char == "]" and expecting in (_FIRST_ITEM, _SEPARATOR):
+                return
+            if expecting == _SEPARATOR:
+                if char != ",":
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", buffer, position
+                    )
+                position += 1
+                expecting = _ITEM
+                continue
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The item may continue in the next chunk.
+                if end_of_stream:
+                    raise
+            else:
+                # A number cut by the end of the chunk also decodes, so only
+                # trust an item once the delimiter following it has arrived.
+                if end_of_stream or _item_delimiter.match(buffer, end):
+                    position = end
+                    expecting = _SEPARATOR
+                    yield item
+                    continue
+
+        if end_of_stream:
+            raise json.JSONDecodeError("Unterminated array", buffer, position)
+        buffer = buffer[position:]
+        position = 0
+        chunk = next(chunks, None)
+        if chunk is None:
+            end_of_stream = True
+            buffer += text_decoder.decode(b"", final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+
+def tap(
+    items: Iterable, observe: Callable, on_exhausted: Callable = None
+) -> Iterator:
+    """Yields `items`, passing each one to `observe` on its way, and calls
+    `on_exhausted` once every item was yielded. Closing the returned iterator
+    closes `items`, so a streamed response can still be cut short."""
+    items = iter(items)
+    try:
+        for item in items:
+            observe(item)
+            yield item
+        if on_exhausted is not None:
+            on_exhausted()
+    finally:
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
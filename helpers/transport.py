@@ -0,0 +1,97 @@
+import threading
+import time
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+
+# Connections are opened by the thread sending the request, so the time spent
+# opening them is tracked per thread.
+_connect_times = threading.local()
+
+
+def pop_connect_time() -> float:
+    """Returns the seconds this thread spent opening connections (TCP and TLS
+    handshakes) since the last call. Zero when a kept-alive connection was
+    reused."""
+    connect_time = getattr(_connect_times, "seconds", 0.0)
+    _connect_times.seconds = 0.0
+    return connect_time
+
+
+class _TimedConnectionMixin():
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_times.seconds = (
+                getattr(_connect_times, "seconds", 0.0)
+                + time.perf_counter()
+                - started_at
+            )
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def build_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+) -> Session:
+    """Returns a session keeping up to `pool_maxsize` connections alive per
+    host, and retrying connection errors with exponential backoff.
+
+    Only connection errors are retried: the request never reached the partner,
+    so retrying is safe even for POST requests. Time spent opening connections
+    is available from `pop_connect_time`.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=backoff_factor,
+        raise_on_status=False,
+    )
+    adapter = _TimedHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 100000
+
+
+class CachedValidation(NamedTuple):
+    passed: bool
+    errors: List[str]
+
+
+class ValidationCache():
+    """SQLite-backed cache of validation outcomes, keyed by the validated
+    resource and the hash of its raw response body.
+
+    A resource whose body did not change since it was last validated against
+    the same schema gets its previous outcome back, without being validated
+    again. Outcomes older than `max_age` seconds are evicted, as are the
+    oldest ones beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS validations ("
+                " key TEXT PRIMARY KEY,"
+                " content_hash TEXT NOT NULL,"
+                " passed INTEGER NOT NULL,"
+                " errors TEXT NOT NULL,"
+                " validated_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS validations_validated_at"
+                " ON validations (validated_at)"
+            )
+        self.evict()
+
+    @staticmethod
+    def content_hash(schema: dict, body: bytes) -> str:
+        """Hashes `body` together with `schema`, so outcomes are not reused
+        once the schema changed."""
+        digest = hashlib.sha256(json.dumps(schema, sort_keys=True).encode())
+        digest.update(body)
+        return digest.hexdigest()
+
+    def get(self, key: str, content_hash: str) -> Optional[CachedValidation]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT passed, errors FROM validations"
+                " WHERE key = ? AND content_hash = ? AND validated_at >= ?",
+                (key, content_hash, time.time() - self.max_age),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedValidation(passed=bool(row[0]), errors=json.loads(row[1]))
+
+    def set(self, key: str, content_hash: str, passed: bool, errors: List[str]):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO validations"
+                " (key, content_hash, passed, errors, validated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, content_hash, int(passed), json.dumps(errors), time.time()),
+            )
+
+    def evict(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM validations WHERE validated_at < ?",
+                (time.time() - self.max_age,),
+            )
+            self._connection.execute(
+                "DELETE FROM validations WHERE key IN ("
+                " SELECT key FROM validations"
+                " ORDER BY validated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self) -> None:
+        self.evict()
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,101 @@
+import json
+
+from helpers.client import DynamicAPIClient
+from helpers.load_generator import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_MIX,
+    DEFAULT_SLO_SECONDS,
+    DEFAULT_SLO_TARGET,
+    run_load,
+)
+from validator import API_KEY, BASE_URL, _dummy_rates, _print
+
+# Requests per second held for DURATION seconds, or ramped from RPS to END_RPS
+# when END_RPS is set.
+DURATION = 60
+RPS = 10
+END_RPS = None
+# Relative weight of each call in the load. `post_rates` posts the same dummy
+# rates as the validator, set its weight to 0 to only send GET requests.
+MIX = DEFAULT_MIX
+# The partner passes when SLO_TARGET of the requests succeed within
+# SLO_SECONDS.
+SLO_SECONDS = DEFAULT_SLO_SECONDS
+SLO_TARGET = DEFAULT_SLO_TARGET
+MAX_WORKERS = DEFAULT_MAX_WORKERS
+REPORT_JSON_PATH = None
+
+
+def _print_report(summary: dict, slo_target: float):
+    lines = [
+        f"Throughput: {summary['throughput_rps']:.1f} req/s achieved for "
+        f"{summary['sent_rps']:.1f} req/s sent "
+        f"({summary['completed']}/{summary['sent']} requests completed)"
+    ]
+    for operation, values in summary["operations"].items():
+        latency = values["latency"]
+        lines.append(
+            f"    - {operation}: {values['requests']} requests, "
+            f"{latency['p50'] * 1000:.0f} / {latency['p95'] * 1000:.0f} / "
+            f"{latency['p99'] * 1000:.0f} ms (p50 / p95 / p99), "
+            f"{values['error_rate']:.1%} errors"
+        )
+        for error, count in sorted(values["errors"].items()):
+            lines.append(f"        - {error}: {count}")
+    _print("\n".join(lines))
+
+    compliance = summary["slo_compliance"]
+    icon = "✅" if compliance >= slo_target else "❌"
+    _print(
+        f"{icon} {compliance:.2%} of requests succeeded within "
+        f"{summary['slo_seconds'] * 1000:.0f} ms (target {slo_target:.2%})"
+    )
+
+
+def run(
+    base_url: str,
+    api_key: str,
+    duration: float = DURATION,
+    rps: float = RPS,
+    end_rps: float = None,
+    mix: dict = MIX,
+    slo_seconds: float = SLO_SECONDS,
+    slo_target: float = SLO_TARGET,
+    max_workers: int = MAX_WORKERS,
+):
+    """Drives the partner API at `base_url` with the `mix` of calls at a fixed
+    or ramping request rate, and reports throughput, errors and latency SLO
+    compliance."""
+    client = DynamicAPIClient(api_key, base_url, pool_maxsize=max_workers)
+    listing_ids = client.get_listing_ids()
+    result = run_load(
+        client,
+        listing_ids,
+        _dummy_rates(),
+        duration=duration,
+        rps=rps,
+        end_rps=end_rps,
+        mix=mix,
+        max_workers=max_workers,
+        slo_seconds=slo_seconds,
+    )
+    summary = result.summary()
+    _print_report(summary, slo_target)
+    return summary
+
+
+if __name__ == "__main__":
+    summary = run(
+        BASE_URL,
+        API_KEY,
+        duration=DURATION,
+        rps=RPS,
+        end_rps=END_RPS,
+        mix=MIX,
+        slo_seconds=SLO_SECONDS,
+        slo_target=SLO_TARGET,
+        max_workers=MAX_WORKERS,
+    )
+    if REPORT_JSON_PATH:
+        with open(REPORT_JSON_PATH, "w") as f:
+            json.dump(summary, f, indent=2)
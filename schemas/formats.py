@@ -0,0 +1,94 @@
+import datetime
+from functools import lru_cache
+
+from jsonschema import Draft202012Validator, FormatChecker
+
+# Distinct strings remembered per format. Calendars repeat the same dates
+# across every listing, so most checks are answered from the cache.
+FORMAT_CACHE_SIZE = 2**16
+
+
+def _is_date_fast(value: str) -> bool:
+    """Checks the `YYYY-MM-DD` shape without a regex."""
+    if len(value) != 10 or value[4] != "-" or value[7] != "-":
+        return False
+    digits = value[:4] + value[5:7] + value[8:]
+    if not (digits.isascii() and digits.isdigit()):
+        return False
+    try:
+        datetime.date(int(value[:4]), int(value[5:7]), int(value[8:]))
+    except ValueError:
+        return False
+    return True
+
+
+def _is_time_fast(value: str) -> bool:
+    """Checks the `HH:MM:SS` shape, without leap seconds."""
+    if value[2:3] != ":" or value[5:6] != ":":
+        return False
+    digits = value[:2] + value[3:5] + value[6:]
+    if len(digits) != 6 or not (digits.isascii() and digits.isdigit()):
+        return False
+    return int(value[:2]) <= 23 and int(value[3:5]) <= 59 and int(value[6:]) <= 59
+
+
+def _is_date_time_fast(value: str) -> bool:
+    """Checks the `YYYY-MM-DDTHH:MM:SS[.fff](Z|+HH:MM)` shape without a regex."""
+    if len(value) < 20 or value[10] not in "Tt":
+        return False
+    if not _is_date_fast(value[:10]) or not _is_time_fast(value[11:19]):
+        return False
+    offset = value[19:]
+    if offset[0] == ".":
+        end = 1
+        while end < len(offset) and "0" <= offset[end] <= "9":
+            end += 1
+        if end == 1:
+            return False
+        offset = offset[end:]
+    if offset in ("Z", "z"):
+        return True
+    if len(offset) != 6 or offset[0] not in "+-" or offset[3] != ":":
+        return False
+    digits = offset[1:3] + offset[4:]
+    if not (digits.isascii() and digits.isdigit()):
+        return False
+    return int(offset[1:3]) <= 23 and int(offset[4:]) <= 59
+
+
+def _memoized(format: str, fast_check):
+    """Wraps the draft 2020-12 checker of `format`: strings passing
+    `fast_check` are valid, the others are left to the original checker, and
+    the outcome of the last FORMAT_CACHE_SIZE strings is remembered."""
+    check, raises = Draft202012Validator.FORMAT_CHECKER.checkers[format]
+
+    @lru_cache(maxsize=FORMAT_CACHE_SIZE)
+    def check_string(value: str) -> bool:
+        return fast_check(value) or check(value)
+
+    def checker(instance: object) -> bool:
+        # Formats only apply to strings.
+        if not isinstance(instance, str):
+            return True
+        return check_string(instance)
+
+    checker.cache_info = check_string.cache_info
+    checker.cache_clear = check_string.cache_clear
+    return checker, raises
+
+
+def _format_checker() -> FormatChecker:
+    format_checker = FormatChecker(formats=())
+    format_checker.checkers = dict(Draft202012Validator.FORMAT_CHECKER.checkers)
+    for format, fast_check in (
+        ("date", _is_date_fast),
+        ("date-time", _is_date_time_fast),
+    ):
+        checker, raises = _memoized(format, fast_check)
+        format_checker.checks(format, raises)(checker)
+    return format_checker
+
+
+# Checks formats like `Draft202012Validator.FORMAT_CHECKER`, with cached
+# `date` and `date-time` checks.
+FORMAT_CHECKER = _format_checker()
@@ -0,0 +1,28 @@
+import threading
+
+from jsonschema import Draft202012Validator
+
+from .formats import FORMAT_CHECKER
+
+# Maps id(schema) -> (schema, validator). The schema is kept in the entry so
+# its id cannot be reused by another dict while the validator is cached.
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def get_validator(schema: dict) -> Draft202012Validator:
+    """Returns the validator for `schema`, checking and compiling the schema
+    the first time it is requested and reusing that validator afterwards."""
+    entry = _validators.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+
+    with _validators_lock:
+        entry = _validators.get(id(schema))
+        if entry is None or entry[0] is not schema:
+            Draft202012Validator.check_schema(schema)
+            # Draft 2020-12 formats, with cached date and date-time checks.
+            validator = Draft202012Validator(schema, format_checker=FORMAT_CHECKER)
+            entry = (schema, validator)
+            _validators[id(schema)] = entry
+    return entry[1]
@@ -0,0 +1,184 @@
+import json
+import os
+import resource
+import time
+
+from helpers.client import DEFAULT_JSON_DECODER
+from helpers.error_report import ErrorReport
+from helpers.payload_generator import (
+    PayloadGenerator,
+    read_json_lines,
+    write_json_lines,
+)
+from schemas import (
+    account_schema,
+    calendar_schema,
+    listings_schema,
+    reservation_list_schema,
+)
+from schemas.registry import get_validator
+from validator import MAX_ERRORS, _print
+
+# Synthetic payloads generated and validated per kind. Scale them, and the
+# calendar and reservation list lengths, to 10-100 times a partner's
+# production volume to stress validation throughput and memory.
+PAYLOADS = {"account": 100, "listing": 10000, "calendar": 100, "reservations": 100}
+CALENDAR_DAYS = 730
+RESERVATIONS = 200
+# Share of the objects (payloads, calendar days and reservations) carrying a
+# defect every validation should report.
+DEFECT_RATE = 0.01
+SEED = 0
+# Set OUTPUT_DIR to write the payloads to disk as JSON lines, <kind>.jsonl,
+# and validate them as they are read back, instead of as they are generated.
+OUTPUT_DIR = None
+REPORT_JSON_PATH = None
+
+# Schema of each kind of payload, and whether it is an array of
+# `array_length` items.
+KINDS = {
+    "account": (account_schema, False),
+    "listing": (listings_schema, False),
+    "calendar": (calendar_schema, True),
+    "reservations": (reservation_list_schema, True),
+}
+
+
+def _peak_memory_bytes() -> int:
+    # Linux reports the maximum resident set size in KiB.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _stress_kind(
+    kind: str,
+    count: int,
+    array_length: int,
+    defect_rate: float,
+    seed: int,
+    output_dir: str = None,
+    max_errors: int = MAX_ERRORS,
+) -> dict:
+    schema, is_array = KINDS[kind]
+    generator = PayloadGenerator(
+        schema, defect_rate=defect_rate, seed=seed, array_length=array_length
+    )
+    # Whether each payload is defective, one byte per payload, so payloads
+    # are never all held in memory.
+    defective = bytearray()
+
+    def generate():
+        for generated in generator.payloads(count):
+            defective.append(bool(generated.defects))
+            yield generated
+
+    started_at = time.perf_counter()
+    size = None
+    if output_dir is not None:
+        path = os.path.join(output_dir, f"{kind}.jsonl")
+        size = write_json_lines(path, generate())
+        documents = read_json_lines(path, loads=DEFAULT_JSON_DECODER)
+    else:
+        documents = (generated.payload for generated in generate())
+
+    validator = get_validator(schema)
+    validate_seconds = 0.0
+    detected = missed = false_alarms = 0
+    for index, document in enumerate(documents):
+        validate_started_at = time.perf_counter()
+        errors = ErrorReport(max_errors=max_errors)
+        for error in validator.iter_errors(document):
+            if not errors.add(error):
+                break
+        validate_seconds += time.perf_counter() - validate_started_at
+        if defective[index]:
+            detected += bool(errors)
+            missed += not errors
+        else:
+            false_alarms += bool(errors)
+
+    objects = count * array_length if is_array else count
+    return {
+        "kind": kind,
+        "payloads": count,
+        "objects": objects,
+        "bytes": size,
+        "elapsed_seconds": time.perf_counter() - started_at,
+        "validate_seconds": validate_seconds,
+        "objects_per_second": objects / validate_seconds if validate_seconds else 0.0,
+        "defective": sum(defective),
+        "detected": detected,
+        "missed": missed,
+        "false_alarms": false_alarms,
+    }
+
+
+def _print_report(summary: dict):
+    for result in summary["kinds"]:
+        size = ""
+        if result["bytes"] is not None:
+            size = f", {result['bytes'] / 2**20:.1f} MiB on disk"
+        _print(
+            f"{result['kind']}: {result['payloads']} payloads "
+            f"({result['objects']} objects{size}) validated in "
+            f"{result['validate_seconds']:.1f}s, "
+            f"{result['objects_per_second']:.0f} objects/s "
+            f"({result['elapsed_seconds']:.1f}s in total)"
+        )
+        icon = "✅" if not result["missed"] and not result["false_alarms"] else "❌"
+        _print(
+            f"{icon} {result['kind']}: {result['detected']}/{result['defective']} "
+            f"defective payloads reported, {result['false_alarms']} valid payloads "
+            "reported"
+        )
+    _print(f"Peak memory: {summary['peak_memory_bytes'] / 2**20:.0f} MiB")
+
+
+def run(
+    payloads: dict = PAYLOADS,
+    calendar_days: int = CALENDAR_DAYS,
+    reservations: int = RESERVATIONS,
+    defect_rate: float = DEFECT_RATE,
+    seed: int = SEED,
+    output_dir: str = None,
+    max_errors: int = MAX_ERRORS,
+):
+    """Validates synthetic payloads generated from `schemas`, `payloads[kind]`
+    of each kind, and reports the validation throughput, the peak memory and
+    whether exactly the defective payloads were reported.
+
+    Payloads are generated, written to `output_dir` if set, and validated one
+    at a time, so only one payload is held in memory at once.
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    array_lengths = {"calendar": calendar_days, "reservations": reservations}
+    results = [
+        _stress_kind(
+            kind,
+            count,
+            array_lengths.get(kind, 1),
+            defect_rate,
+            seed,
+            output_dir=output_dir,
+            max_errors=max_errors,
+        )
+        for kind, count in payloads.items()
+        if count
+    ]
+    summary = {"kinds": results, "peak_memory_bytes": _peak_memory_bytes()}
+    _print_report(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    summary = run(
+        payloads=PAYLOADS,
+        calendar_days=CALENDAR_DAYS,
+        reservations=RESERVATIONS,
+        defect_rate=DEFECT_RATE,
+        seed=SEED,
+        output_dir=OUTPUT_DIR,
+    )
+    if REPORT_JSON_PATH:
+        with open(REPORT_JSON_PATH, "w") as f:
+            json.dump(summary, f, indent=2)
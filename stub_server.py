@@ -0,0 +1,226 @@
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from helpers import payloads
+from helpers.client import DynamicAPIClient
+
+HOST = "127.0.0.1"
+PORT = 8765
+API_KEY = "stub-api-key"
+# Size of the synthetic account.
+LISTINGS = 100
+CALENDAR_DAYS = 730
+RESERVATIONS = 20
+# Every response is delayed by LATENCY seconds plus up to LATENCY_JITTER
+# seconds, and ERROR_RATE of the requests fail with a 500.
+LATENCY = 0.0
+LATENCY_JITTER = 0.0
+ERROR_RATE = 0.0
+
+_ROUTE_PATTERNS = [
+    (route, re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path) + "$"))
+    for route, path in DynamicAPIClient.ROUTES.items()
+]
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._handle("POST")
+
+    def _handle(self, method):
+        stub = self.server.stub
+        stub.delay()
+        if self.headers.get("x-api-key") != stub.api_key:
+            return self._send(401, b'{"error": "Invalid API key"}')
+        if stub.should_fail():
+            return self._send(500, b'{"error": "Injected error"}')
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        for route, pattern in _ROUTE_PATTERNS:
+            match = pattern.match(url.path)
+            if match:
+                status, body = stub.respond(
+                    method,
+                    route,
+                    checkin_start_date=query.get("checkinStartDate", [None])[0],
+                    **match.groupdict(),
+                )
+                return self._send(status, body)
+        self._send(404, b'{"error": "Not found"}')
+
+    def _send(self, status, body):
+        etag = _etag(body)
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        compressed = bool(body) and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compressed:
+            body = _gzip(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@lru_cache(maxsize=1024)
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.md5(body).hexdigest() + '"'
+
+
+@lru_cache(maxsize=1024)
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=1)
+
+
+class StubPartnerServer():
+    """A local partner API implementing every route of
+    `DynamicAPIClient.ROUTES`, serving synthetic payloads matching `schemas`.
+
+    Use it as a context manager to serve from a background thread:
+
+        with StubPartnerServer(listings=1000) as stub:
+            validator.run(stub.base_url, stub.api_key)
+    """
+
+    def __init__(
+        self,
+        host: str = HOST,
+        port: int = 0,
+        api_key: str = API_KEY,
+        listings: int = LISTINGS,
+        calendar_days: int = CALENDAR_DAYS,
+        reservations: int = RESERVATIONS,
+        latency: float = LATENCY,
+        latency_jitter: float = LATENCY_JITTER,
+        error_rate: float = ERROR_RATE,
+        seed: int = 0,
+    ) -> None:
+        self.api_key = api_key
+        self.calendar_days = calendar_days
+        self.reservations = reservations
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.listing_ids = payloads.listing_ids_payload(listings)
+        self._listing_ids = set(self.listing_ids)
+        self._random = random.Random(seed)
+        self._httpd = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+        # Cached per server, so stopped servers are not kept alive.
+        self._body = lru_cache(maxsize=1024)(self._build_body)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def delay(self):
+        if self.latency or self.latency_jitter:
+            time.sleep(self.latency + self._random.uniform(0, self.latency_jitter))
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def respond(
+        self,
+        method,
+        route,
+        listing_id=None,
+        reservation_id=None,
+        checkin_start_date=None,
+    ):
+        """Returns the status code and JSON body answering `method` on
+        `route`."""
+        if listing_id is not None and listing_id not in self._listing_ids:
+            return 404, b'{"error": "Listing not found"}'
+        if route == "PATH_CALENDAR" and method == "POST":
+            return 201, b"[]"
+        if method != "GET":
+            return 405, b'{"error": "Method not allowed"}'
+        if route == "PATH_RESERVATION":
+            listing_id, _, index = reservation_id.rpartition(".")
+            if (
+                listing_id not in self._listing_ids
+                or not index.isdigit()
+                or int(index) >= self.reservations
+            ):
+                return 404, b'{"error": "Reservation not found"}'
+        return 200, self._body(route, listing_id, reservation_id, checkin_start_date)
+
+    def _build_body(
+        self, route, listing_id, reservation_id, checkin_start_date
+    ) -> bytes:
+        if route == "PATH_ACCOUNT":
+            payload = payloads.account_payload()
+        elif route == "PATH_LISTINGS":
+            payload = self.listing_ids
+        elif route == "PATH_LISTING":
+            payload = payloads.listing_payload(listing_id)
+        elif route == "PATH_CALENDAR":
+            payload = payloads.calendar_payload(
+                self.calendar_days, reservations=self.reservations
+            )
+        elif route == "PATH_LISTING_RESERVATION":
+            payload = payloads.reservation_list_payload(self.reservations, listing_id)
+            if checkin_start_date:
+                # ISO dates sort like the dates they represent.
+                payload = [
+                    reservation
+                    for reservation in payload
+                    if reservation["checkinDate"] >= checkin_start_date
+                ]
+        else:
+            listing_id, _, index = reservation_id.rpartition(".")
+            payload = payloads.reservation_list_payload(int(index) + 1, listing_id)[-1]
+        return json.dumps(payload).encode()
+
+
+if __name__ == "__main__":
+    server = StubPartnerServer(host=HOST, port=PORT)
+    print(f"Serving a stub partner API at {server.base_url} (API key: {API_KEY})")
+    server.serve_forever()
@@ -1,7 +1,25 @@
+import json
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
-from jsonschema import Draft202012Validator
+from helpers.cache import ResponseCache
+from helpers.calendar_rules import describe_range, evaluate_rules
+from helpers.calendar_store import CalendarStore, CompactCalendar
 from helpers.client import DynamicAPIClient
+from helpers.consistency import ListingConsistency
+from helpers.datehelpers import utc_today
+from helpers.error_report import ErrorReport
+from helpers.metrics import RequestMetrics
+from helpers.rate_limiter import RateLimiter, get_rate_limiter
+from helpers.recording import Recorder, ReplaySession
+from helpers.reservation_sync import HighWaterMarks
+from helpers.validation_cache import ValidationCache
+from helpers.scheduler import Task, run_tasks
+from helpers.streaming import tap
 from schemas import (
     account_schema,
     calendar_schema,
@@ -10,30 +28,146 @@ from schemas import (
     reservation_list_schema,
     reservation_schema,
 )
+from schemas.registry import get_validator
 from helpers import exceptions as DynamicExceptions
 
 from dateutil.relativedelta import relativedelta
 import datetime
 BASE_URL=""
 API_KEY=""
+# Set FLEET to True to run the listing, calendar and reservations checks
+# against every listing (or a random sample of FLEET_SAMPLE_SIZE listings).
+FLEET = False
+FLEET_SAMPLE_SIZE = None
+FLEET_MAX_WORKERS = 16
+# Number of checks run concurrently. Checks only wait for the fixtures they
+# need, so independent ones do not wait for each other.
+CHECK_MAX_WORKERS = 8
+# Set STREAMING to True to validate calendars and reservations day by day and
+# reservation by reservation as they are downloaded, instead of loading the
+# whole response in memory first.
+STREAMING = False
+# Latency and payload size percentiles per endpoint are printed after the
+# checks, and exported as JSON and as a Prometheus textfile when a path is set.
+METRICS_JSON_PATH = None
+METRICS_PROMETHEUS_PATH = None
+# Set to a JSON file path to only validate the reservations checking in since
+# the previous run, instead of every listing's whole reservation history.
+RESERVATIONS_HIGH_WATER_MARKS_PATH = None
+# Set to a SQLite file path to skip validating the payloads whose body did not
+# change since a previous run.
+VALIDATION_CACHE_PATH = None
+# Errors are reported grouped by schema path and keyword. Validating a payload
+# stops after MAX_ERRORS errors, set it to None to find every error.
+MAX_ERRORS = 1000
+# Set to True to also check each listing's calendar and reservations agree:
+# booked days are covered by accepted reservations, which do not overlap and
+# belong to listings returned by GET /listings.
+CONSISTENCY_CHECKS = False
+# Set to True to also check calendars follow semantic rules: dates are
+# contiguous and not duplicated, dailyPrice is positive and at most
+# MAX_DAILY_PRICE, minNights is at least 1 and available days have check-in
+# days.
+CALENDAR_RULES = False
+MAX_DAILY_PRICE = 100000
+# Set RECORDING_PATH to record every response to a compressed archive, and
+# REPLAY_PATH to run the checks against a recorded archive instead of the API.
+RECORDING_PATH = None
+REPLAY_PATH = None
+# Requests start paced at RATE_LIMIT_RPS requests per second. The rate grows
+# while the partner keeps up, up to RATE_LIMIT_MAX_RPS, and backs off on 429
+# responses, honoring their Retry-After header. Set RATE_LIMIT_TARGET_LATENCY
+# to also back off whenever a response takes longer than that many seconds.
+# Set RATE_LIMIT_RPS to None to send requests unpaced.
+RATE_LIMIT_RPS = 20
+RATE_LIMIT_MAX_RPS = 200
+RATE_LIMIT_TARGET_LATENCY = None
+# Requests time out after the seconds of DynamicAPIClient.ROUTE_TIMEOUTS for
+# their route, overridden by ROUTE_TIMEOUTS, e.g. {"PATH_CALENDAR": 300}. Set
+# RUN_BUDGET to fail the requests sent once a run took that many seconds.
+ROUTE_TIMEOUTS = None
+RUN_BUDGET = None
+# Set HEDGE_REQUESTS to True to send a duplicate of the GETs taking longer
+# than their route's observed p95 latency, taking whichever answers first.
+HEDGE_REQUESTS = False
 
+_print_lock = threading.Lock()
 
 
-def _log_report_for_20x(context: str, schema: dict, payload: dict):
-    validator = Draft202012Validator(
-        schema, format_checker=Draft202012Validator.FORMAT_CHECKER
-    )
+def _print(message):
+    # Fleet sweeps report from many threads at once, print one whole message
+    # at a time so reports do not interleave.
+    with _print_lock:
+        print(message)
+
+
+def _log_report_for_20x(
+    context: str,
+    schema: dict,
+    payload: dict,
+    validation_cache: ValidationCache = None,
+    body: bytes = None,
+    max_errors: int = MAX_ERRORS,
+):
+    content_hash = None
+    if validation_cache is not None and body is not None:
+        # `context` names the route and the resource, reuse the outcome of
+        # its last validation if its body did not change since.
+        content_hash = ValidationCache.content_hash(schema, body)
+        cached = validation_cache.get(context, content_hash)
+        if cached is not None:
+            icon = "✅" if cached.passed else "❌"
+            _print("\n".join([f"{icon} {context} (unchanged)"] + cached.errors))
+            return cached.passed
 
-    errors = sorted(validator.iter_errors(payload), key=str)
+    validator = get_validator(schema)
+
+    errors = ErrorReport(max_errors=max_errors)
+    for error in validator.iter_errors(payload):
+        if not errors.add(error):
+            break
+    lines = errors.lines()
+    if content_hash is not None:
+        validation_cache.set(context, content_hash, not errors, lines)
 
     if not errors:
-        print(f"✅ {context}")
-        return
+        _print(f"✅ {context}")
+        return True
+
+    _print("\n".join([f"❌ {context}"] + lines))
+    return False
 
-    print(f"❌ {context}")
 
-    for error in errors:
-        print(f"    - {error.json_path} - {error.message}")
+def _log_report_for_20x_stream(
+    context: str, item_schema: dict, items, max_errors: int = MAX_ERRORS
+):
+    """Validates a streamed JSON array item by item against `item_schema`, so
+    only the item being validated is held in memory."""
+    validator = get_validator(item_schema)
+
+    errors = ErrorReport(max_errors=max_errors)
+    decode_error = None
+    try:
+        for index, item in enumerate(items):
+            for error in validator.iter_errors(item):
+                if not errors.add(error, f"$[{index}]{error.json_path[1:]}"):
+                    break
+            if errors.truncated:
+                # Stop downloading the rest of the array.
+                items.close()
+                break
+    except json.JSONDecodeError as e:
+        decode_error = f"    - $ - Response is not a JSON array: {e}"
+
+    if not errors and decode_error is None:
+        _print(f"✅ {context}")
+        return True
+
+    lines = [f"❌ {context}"] + errors.lines()
+    if decode_error is not None:
+        lines.append(decode_error)
+    _print("\n".join(lines))
+    return False
 
 
 def _validate_account_endpoint_returns_200(client: DynamicAPIClient):
@@ -46,22 +180,37 @@ def _validate_account_endpoint_returns_200(client: DynamicAPIClient):
     )
 
 
-def _validate_account_endpoint_returns_401(client: DynamicAPIClient):
-    invalid_client = DynamicAPIClient(
-        api_key="invalid-api-key", base_url=client.base_url
-    )
+def _validate_account_endpoint_returns_401(
+    client: DynamicAPIClient, invalid_client: DynamicAPIClient = None
+):
+    """Pass an `invalid_client` sending an invalid API key to reuse it."""
+    if invalid_client is None:
+        invalid_client = DynamicAPIClient(
+            api_key="invalid-api-key",
+            base_url=client.base_url,
+            session=client.session,
+            metrics=client.metrics,
+            recorder=client.recorder,
+            rate_limiter=client.rate_limiter,
+            timeouts=client.timeouts,
+            deadline=client.deadline,
+        )
 
     try:
         invalid_client.get_account_information()
     except DynamicExceptions.InvalidCredentials:
-        print("✅ GET /account status:401")
+        _print("✅ GET /account status:401")
     except Exception as e:
-        print(e)
-        print("❌ GET /account status:401")
+        _print(e)
+        _print("❌ GET /account status:401")
 
 
-def _validate_listing_ids_endpoint_returns_200(client: DynamicAPIClient):
-    listing_ids_payload = client.get_listing_ids()
+def _validate_listing_ids_endpoint_returns_200(
+    client: DynamicAPIClient, listing_ids: list = None
+):
+    listing_ids_payload = listing_ids
+    if listing_ids_payload is None:
+        listing_ids_payload = client.get_listing_ids()
 
     _log_report_for_20x(
         context="GET /listings status:200",
@@ -70,14 +219,21 @@ def _validate_listing_ids_endpoint_returns_200(client: DynamicAPIClient):
     )
 
 
-def _validate_listing_endpoint_returns_200(client: DynamicAPIClient):
-    listing_ids_payload = client.get_listing_ids()
-    listing_id = listing_ids_payload[0]
+def _validate_listing_endpoint_returns_200(
+    client: DynamicAPIClient,
+    listing_id: str = None,
+    validation_cache: ValidationCache = None,
+):
+    if listing_id is None:
+        listing_ids_payload = client.get_listing_ids()
+        listing_id = listing_ids_payload[0]
     listing_payload = client.get_listing_by_id(listing_id)
-    _log_report_for_20x(
+    return _log_report_for_20x(
         context=f"GET /listings/{listing_id} status:200",
         schema=listings_schema,
         payload=listing_payload,
+        validation_cache=validation_cache,
+        body=client.last_response_content(),
     )
 
 
@@ -85,25 +241,62 @@ def _validate_listing_endpoint_returns_404(client: DynamicAPIClient):
     try:
         client.get_listing_by_id("invalid-id")
     except DynamicExceptions.PropertyNotFound:
-        print("✅ GET /listings/invalid-id status:404")
+        _print("✅ GET /listings/invalid-id status:404")
     except Exception:
-        print("❌ GET /listings/invalid-id status:404")
+        _print("❌ GET /listings/invalid-id status:404")
 
 
-def _validate_listing_calendar_endpoint_returns_200(client: DynamicAPIClient):
-    listing_ids_payload = client.get_listing_ids()
-    listing_id = listing_ids_payload[0]
+def _validate_listing_calendar_endpoint_returns_200(
+    client: DynamicAPIClient,
+    listing_id: str = None,
+    streaming: bool = False,
+    validation_cache: ValidationCache = None,
+    listing_consistency: ListingConsistency = None,
+    calendar_store: CalendarStore = None,
+):
+    """With `calendar_store`, the calendar read is also added to it, for its
+    rules to be checked."""
+    if listing_id is None:
+        listing_ids_payload = client.get_listing_ids()
+        listing_id = listing_ids_payload[0]
     try:
-        calendar_payload = client.get_calendar_by_listing_id(listing_id)
+        if streaming:
+            calendar_payload = client.iter_calendar_by_listing_id(listing_id)
+        else:
+            calendar_payload = client.get_calendar_by_listing_id(listing_id)
     except DynamicExceptions.StatusCodeException as e:
-        print(
+        _print(
             f"❌ GET /listings/{listing_id}/calendar returned a {e.status_code} status:200"
         )
-        return
-    _log_report_for_20x(
+        return False
+    if streaming:
+        if listing_consistency is not None:
+            calendar_payload = listing_consistency.read_calendar(calendar_payload)
+        if calendar_store is not None:
+            # Only stored once read in full, so an interrupted stream does
+            # not leave a partial calendar behind.
+            calendar = CompactCalendar()
+            calendar_payload = tap(
+                calendar_payload,
+                calendar.append,
+                on_exhausted=partial(calendar_store.__setitem__, listing_id, calendar),
+            )
+        return _log_report_for_20x_stream(
+            context=f"GET /listings/{listing_id}/calendar status:200",
+            item_schema=calendar_schema["items"],
+            items=calendar_payload,
+        )
+    if listing_consistency is not None and isinstance(calendar_payload, list):
+        for _ in listing_consistency.read_calendar(calendar_payload):
+            pass
+    if calendar_store is not None and isinstance(calendar_payload, list):
+        calendar_store.add(listing_id, calendar_payload)
+    return _log_report_for_20x(
         context=f"GET /listings/{listing_id}/calendar status:200",
         schema=calendar_schema,
         payload=calendar_payload,
+        validation_cache=validation_cache,
+        body=client.last_response_content(),
     )
 
 
@@ -111,16 +304,14 @@ def _validate_listing_calendar_endpoint_returns_404(client: DynamicAPIClient):
     try:
         client.get_calendar_by_listing_id("invalid-id")
     except DynamicExceptions.PropertyNotFound:
-        print("✅ GET /listings/invalid-id/calendar status:404")
+        _print("✅ GET /listings/invalid-id/calendar status:404")
     except Exception:
-        print("❌ GET /listings/invalid-id/calendar status:404")
+        _print("❌ GET /listings/invalid-id/calendar status:404")
 
 
-def _validate_post_prices_endpoint_returns_201(client: DynamicAPIClient):
-    listing_ids_payload = client.get_listing_ids()
-    listing_id = listing_ids_payload[0]
+def _dummy_rates():
     date = datetime.date.today()
-    dummy_rates = [
+    return [
         {
             "date": (date + relativedelta(days=1)).isoformat(),
             "dailyPrice": 296,
@@ -145,6 +336,15 @@ def _validate_post_prices_endpoint_returns_201(client: DynamicAPIClient):
             "extraGuestFee": 156,
         },
     ]
+
+
+def _validate_post_prices_endpoint_returns_201(
+    client: DynamicAPIClient, listing_id: str = None
+):
+    if listing_id is None:
+        listing_ids_payload = client.get_listing_ids()
+        listing_id = listing_ids_payload[0]
+    dummy_rates = _dummy_rates()
     calendar_payload = client.post_rates(listing_id, dummy_rates)
     _log_report_for_20x(
         context=f"POST /listing/{listing_id}/calendar status:201",
@@ -159,71 +359,421 @@ def _validate_post_prices_endpoint_returns_404(client: DynamicAPIClient):
     try:
         client.post_rates("invalid-id", dummy_rates)
     except DynamicExceptions.PropertyNotFound:
-        print("✅ POST /listings/invalid-id/calendar status:404")
+        _print("✅ POST /listings/invalid-id/calendar status:404")
     except Exception:
-        print("❌ POST /listings/invalid-id/calendar status:404")
+        _print("❌ POST /listings/invalid-id/calendar status:404")
+
+
+def _keep_first(items: list, item) -> None:
+    if not items:
+        items.append(item)
 
 
-def _validate_listing_reservations_endpoint_returns_200(client: DynamicAPIClient):
-    listing_ids_payload = client.get_listing_ids()
+def _validate_listing_reservations_endpoint_returns_200(
+    client: DynamicAPIClient,
+    listing_id: str = None,
+    streaming: bool = False,
+    checkin_start_date: datetime.date = None,
+    validation_cache: ValidationCache = None,
+    listing_consistency: ListingConsistency = None,
+    first_reservations: list = None,
+):
+    """With `first_reservations`, the first reservation read is appended to
+    it, for the reservation check not to fetch the list again."""
     try:
-        listing_id = listing_ids_payload[0]
-        reservation_list_payload = client.get_reservations_by_listing_id(listing_id)
+        if listing_id is None:
+            listing_ids_payload = client.get_listing_ids()
+            listing_id = listing_ids_payload[0]
+        context = f"GET /listings/{listing_id}/reservations status:200"
+        if checkin_start_date is not None:
+            context = (
+                f"GET /listings/{listing_id}/reservations"
+                f"?checkinStartDate={checkin_start_date.isoformat()} status:200"
+            )
 
-        _log_report_for_20x(
-            context=f"GET /listings/{listing_id}/reservations status:200",
+        if streaming:
+            reservations = client.iter_reservations_by_listing_id(
+                listing_id, checkin_start_date=checkin_start_date
+            )
+            if listing_consistency is not None:
+                reservations = listing_consistency.read_reservations(
+                    reservations, checkin_start_date
+                )
+            if first_reservations is not None:
+                reservations = tap(
+                    reservations, partial(_keep_first, first_reservations)
+                )
+            return _log_report_for_20x_stream(
+                context=context,
+                item_schema=reservation_list_schema["items"],
+                items=reservations,
+            )
+        reservation_list_payload = client.get_reservations_by_listing_id(
+            listing_id, checkin_start_date=checkin_start_date
+        )
+        if listing_consistency is not None and isinstance(
+            reservation_list_payload, list
+        ):
+            for _ in listing_consistency.read_reservations(
+                reservation_list_payload, checkin_start_date
+            ):
+                pass
+        if first_reservations is not None and isinstance(
+            reservation_list_payload, list
+        ):
+            first_reservations.extend(reservation_list_payload[:1])
+        return _log_report_for_20x(
+            context=context,
             schema=reservation_list_schema,
             payload=reservation_list_payload,
+            validation_cache=validation_cache,
+            body=client.last_response_content(),
         )
     except IndexError:
-        print(f"❌ GET /listings/{listing_id}/reservations does not return a list.")
+        _print(f"❌ GET /listings/{listing_id}/reservations does not return a list.")
 
     except DynamicExceptions.InvalidCredentials:
-        print(
+        _print(
             f"❌ GET /listings/{listing_id}/reservations - Our credentials are invalid"
         )
+    return False
 
 
 def _validate_listing_reservations_endpoint_returns_404(client: DynamicAPIClient):
     try:
         client.get_reservations_by_listing_id("invalid-id")
     except DynamicExceptions.PropertyNotFound:
-        print("✅ GET /listings/invalid-id/reservations status:404")
+        _print("✅ GET /listings/invalid-id/reservations status:404")
     except Exception:
-        print("❌ GET /listings/invalid-id/reservations status:404")
+        _print("❌ GET /listings/invalid-id/reservations status:404")
 
 
-def _validate_reservation_endpoint_returns_200(client: DynamicAPIClient):
-    listing_ids_payload = client.get_listing_ids()
+def _validate_reservation_endpoint_returns_200(
+    client: DynamicAPIClient,
+    listing_id: str = None,
+    streaming: bool = False,
+    checkin_start_date: datetime.date = None,
+    validation_cache: ValidationCache = None,
+    reservations: list = None,
+):
+    """Pass the listing's `reservations`, or only their first one, when they
+    were already read."""
     try:
-        listing_id = listing_ids_payload[0]
-        reservations = client.get_reservations_by_listing_id(listing_id)
+        if listing_id is None:
+            listing_ids_payload = client.get_listing_ids()
+            listing_id = listing_ids_payload[0]
+        # Any reservation will do, so avoid pulling the whole history when
+        # only recent check-ins are synced.
+        if reservations is not None:
+            pass
+        elif streaming:
+            # Only the first reservation is needed, stop reading after it.
+            reservations_stream = client.iter_reservations_by_listing_id(
+                listing_id, checkin_start_date=checkin_start_date
+            )
+            first_reservation = next(reservations_stream, None)
+            reservations_stream.close()
+            reservations = [first_reservation] if first_reservation else []
+        else:
+            reservations = client.get_reservations_by_listing_id(
+                listing_id, checkin_start_date=checkin_start_date
+            )
+        if len(reservations) == 0 and checkin_start_date is not None:
+            _print(
+                f"➖ Skipped GET /reservations/{{id}} because listings/{listing_id}/reservations has no reservations checking in since {checkin_start_date.isoformat()}."
+            )
+            return True
         if len(reservations) == 0:
-            print(
+            _print(
                 "❌ Couldn't Validate GET /reservations/{id} because listings/{listing_id}/reservations returned no reservations."
             )
-            return
+            return False
 
         reservation_id = reservations[0]["id"]
         reservation_payload = client.get_reservation(reservation_id)
-        _log_report_for_20x(
+        return _log_report_for_20x(
             context=f"GET /reservations/{reservation_id} status:200",
             schema=reservation_schema,
             payload=reservation_payload,
+            validation_cache=validation_cache,
+            body=client.last_response_content(),
         )
-    except IndexError:
-        print(f"❌ GET /listings/{listing_id}/reservations does not return a list.")
+    except (IndexError, KeyError, TypeError):
+        _print(f"❌ GET /listings/{listing_id}/reservations does not return a list.")
     except DynamicExceptions.InvalidCredentials:
-        print(f"❌ GET /listings/{listing_id}/reservations Returns a 401.")
+        _print(f"❌ GET /listings/{listing_id}/reservations Returns a 401.")
+    return False
+
+
+def _validate_listing_reservations(
+    client: DynamicAPIClient,
+    listing_id: str,
+    streaming: bool = False,
+    high_water_marks: HighWaterMarks = None,
+    validation_cache: ValidationCache = None,
+    listing_consistency: ListingConsistency = None,
+):
+    """Runs the reservations checks for one listing. With `high_water_marks`,
+    both only ask for the reservations checking in since the listing's mark,
+    read once before either runs, and the mark only advances once both
+    passed."""
+    checkin_start_date = None
+    if high_water_marks is not None:
+        checkin_start_date = high_water_marks.checkin_start_date(listing_id)
+        synced_on = utc_today()
+    first_reservations = []
+    listed = _validate_listing_reservations_endpoint_returns_200(
+        client,
+        listing_id,
+        streaming=streaming,
+        checkin_start_date=checkin_start_date,
+        validation_cache=validation_cache,
+        listing_consistency=listing_consistency,
+        first_reservations=first_reservations,
+    )
+    # The list is only fetched again when the list check could not read it.
+    found = _validate_reservation_endpoint_returns_200(
+        client,
+        listing_id,
+        streaming=streaming,
+        checkin_start_date=checkin_start_date,
+        validation_cache=validation_cache,
+        reservations=first_reservations if listed else None,
+    )
+    passed = listed and found
+    # Failing listings keep their mark, to be validated again next run.
+    if passed and high_water_marks is not None:
+        high_water_marks.advance(listing_id, synced_on)
+    return passed
 
 
 def _validate_reservation_endpoint_returns_404(client: DynamicAPIClient):
     try:
         client.get_reservation("invalid-id")
     except DynamicExceptions.ReservationNotFound:
-        print("✅ GET /reservations/invalid_id be status:404")
+        _print("✅ GET /reservations/invalid_id be status:404")
     except Exception:
-        print("❌ Couldn't Validate GET /reservations/invalid_id be status:404")
+        _print("❌ Couldn't Validate GET /reservations/invalid_id be status:404")
+
+
+def _validate_listing_consistency(
+    client: DynamicAPIClient,
+    listing_id: str,
+    listing_consistency: ListingConsistency,
+    streaming: bool = False,
+    max_issues: int = 10,
+):
+    """Checks the calendar and reservations of `listing_id` agree with each
+    other and with the account's listing IDs, from what the calendar and
+    reservations checks read into `listing_consistency`.
+
+    Only what they did not read in full is fetched again, reservations from
+    the calendar's first night on rather than the whole history."""
+    try:
+        if not listing_consistency.calendar_read:
+            calendar = _calendar_days(client, listing_id, streaming)
+            for _ in listing_consistency.read_calendar(calendar):
+                pass
+        if not listing_consistency.has_reservations():
+            checkin_start_date = listing_consistency.required_checkin_start_date()
+            if streaming:
+                reservations = client.iter_reservations_by_listing_id(
+                    listing_id, checkin_start_date=checkin_start_date
+                )
+            else:
+                reservations = client.get_reservations_by_listing_id(
+                    listing_id, checkin_start_date=checkin_start_date
+                )
+            for _ in listing_consistency.read_reservations(
+                reservations, checkin_start_date
+            ):
+                pass
+    except json.JSONDecodeError as e:
+        _print(
+            f"❌ Listing {listing_id} consistency - Response is not a JSON array: {e}"
+        )
+        return False
+    report = listing_consistency.report()
+
+    context = f"Listing {listing_id} calendar and reservations are consistent"
+    if report:
+        _print(f"✅ {context}")
+        return True
+
+    issues = [
+        f"Booked days from {first.isoformat()} to {last.isoformat()} are not "
+        f"covered by an accepted reservation"
+        for first, last in report.uncovered_booked_days
+    ]
+    issues.extend(
+        f"Accepted reservations {first} and {second} overlap"
+        for first, second in report.overlapping_reservations
+    )
+    issues.extend(
+        f"Reservation {reservation_id} belongs to listing {other_listing_id!r}, "
+        f"which GET /listings does not return"
+        for reservation_id, other_listing_id in report.unknown_listing_ids
+    )
+    lines = [f"❌ {context}"]
+    lines.extend(f"    - {issue}" for issue in issues[:max_issues])
+    if len(issues) > max_issues:
+        lines.append(f"    - and {len(issues) - max_issues} more")
+    _print("\n".join(lines))
+    return False
+
+
+def _report_calendar_rules(store: CalendarStore, max_ranges: int = 5):
+    """Evaluates the calendar rules on every calendar of `store` at once and
+    returns the IDs of the listings breaking them."""
+    violations = evaluate_rules(store, max_daily_price=MAX_DAILY_PRICE)
+    for listing_id in store:
+        context = f"GET /listings/{listing_id}/calendar rules"
+        if listing_id not in violations:
+            _print(f"✅ {context}")
+            continue
+        dates = store[listing_id].dates
+        lines = [f"❌ {context}"]
+        for violation in violations[listing_id]:
+            ranges = ", ".join(
+                describe_range(dates, first, last)
+                for first, last in violation.ranges[:max_ranges]
+            )
+            if len(violation.ranges) > max_ranges:
+                ranges += f" and {len(violation.ranges) - max_ranges} more"
+            lines.append(
+                f"    - {violation.message} ({violation.count} days): {ranges}"
+            )
+        _print("\n".join(lines))
+    return set(violations)
+
+
+def _calendar_days(client: DynamicAPIClient, listing_id: str, streaming: bool):
+    if streaming:
+        return client.iter_calendar_by_listing_id(listing_id)
+    return client.get_calendar_by_listing_id(listing_id)
+
+
+def _validate_listing_calendar_rules(
+    client: DynamicAPIClient,
+    listing_id: str,
+    calendar_store: CalendarStore,
+    streaming: bool = False,
+):
+    """Checks the rules on the calendar the calendar check added to
+    `calendar_store`, fetching it only if that check could not read it."""
+    if listing_id not in calendar_store:
+        calendar_store.add(listing_id, _calendar_days(client, listing_id, streaming))
+    return not _report_calendar_rules(calendar_store)
+
+
+def _validate_listing(
+    client: DynamicAPIClient,
+    listing_id: str,
+    streaming: bool = False,
+    high_water_marks: HighWaterMarks = None,
+    validation_cache: ValidationCache = None,
+    consistency: bool = False,
+    listing_ids=None,
+    calendar_store: CalendarStore = None,
+):
+    """Runs the listing, calendar and reservations checks for one listing.
+    With `consistency`, also checks they agree with each other and with the
+    account's `listing_ids`. The calendar is added to `calendar_store` if
+    given, for its rules to be checked along the fleet's."""
+    listing_consistency = None
+    if consistency:
+        listing_consistency = ListingConsistency(listing_ids)
+    results = [
+        _validate_listing_endpoint_returns_200(
+            client, listing_id, validation_cache=validation_cache
+        ),
+        _validate_listing_calendar_endpoint_returns_200(
+            client,
+            listing_id,
+            streaming=streaming,
+            validation_cache=validation_cache,
+            listing_consistency=listing_consistency,
+            calendar_store=calendar_store,
+        ),
+        _validate_listing_reservations(
+            client,
+            listing_id,
+            streaming=streaming,
+            high_water_marks=high_water_marks,
+            validation_cache=validation_cache,
+            listing_consistency=listing_consistency,
+        ),
+    ]
+    if calendar_store is not None and listing_id not in calendar_store:
+        # The calendar check could not read the whole calendar.
+        calendar_store.add(listing_id, _calendar_days(client, listing_id, streaming))
+    if listing_consistency is not None:
+        results.append(
+            _validate_listing_consistency(
+                client, listing_id, listing_consistency, streaming=streaming
+            )
+        )
+    return all(results)
+
+
+def _validate_fleet(
+    client: DynamicAPIClient,
+    listing_ids: list = None,
+    sample_size: int = None,
+    max_workers: int = FLEET_MAX_WORKERS,
+    streaming: bool = False,
+    high_water_marks: HighWaterMarks = None,
+    validation_cache: ValidationCache = None,
+    consistency: bool = False,
+    calendar_rules: bool = False,
+):
+    """Runs the per-listing checks for every listing of the account, or for a
+    random sample of `sample_size` listings, on a bounded thread pool. With
+    `calendar_rules`, the rules of all their calendars are checked at once
+    afterwards."""
+    if listing_ids is None:
+        listing_ids = client.get_listing_ids()
+    known_listing_ids = frozenset(listing_ids)
+    calendar_store = CalendarStore() if calendar_rules else None
+    if sample_size is not None and sample_size < len(listing_ids):
+        listing_ids = random.sample(listing_ids, sample_size)
+
+    failed_listing_ids = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _validate_listing,
+                client,
+                listing_id,
+                streaming=streaming,
+                high_water_marks=high_water_marks,
+                validation_cache=validation_cache,
+                consistency=consistency,
+                listing_ids=known_listing_ids,
+                calendar_store=calendar_store,
+            ): listing_id
+            for listing_id in listing_ids
+        }
+        for future in as_completed(futures):
+            listing_id = futures[future]
+            try:
+                passed = future.result()
+            except Exception as e:
+                _print(f"❌ GET /listings/{listing_id} failed with error: {e!r}")
+                passed = False
+            if not passed:
+                failed_listing_ids.append(listing_id)
+    if calendar_store is not None:
+        failed_listing_ids.extend(
+            _report_calendar_rules(calendar_store) - set(failed_listing_ids)
+        )
+
+    passed_count = len(listing_ids) - len(failed_listing_ids)
+    icon = "✅" if not failed_listing_ids else "❌"
+    _print(f"{icon} Fleet: {passed_count}/{len(listing_ids)} listings passed")
+    for listing_id in sorted(failed_listing_ids):
+        _print(f"    - {listing_id}")
+    return not failed_listing_ids
 
 
 def _pre_work(disable_logging: bool = True):
@@ -234,23 +784,324 @@ def _pre_work(disable_logging: bool = True):
         utilities_logger.propagate = True
 
 
-def run(base_url: str, api_key: str, disable_logging: bool = True):
+def _print_metrics(metrics: RequestMetrics):
+    lines = ["Latency (p50 / p95 / p99) and decompressed size (p50) per endpoint:"]
+    for route, methods in metrics.summary().items():
+        path = DynamicAPIClient.ROUTES[route]
+        for method, values in methods.items():
+            if "total_seconds" not in values:
+                continue
+            total = values["total_seconds"]
+            lines.append(
+                f"    - {method} {path}: "
+                f"{total['p50'] * 1000:.0f} / {total['p95'] * 1000:.0f} / "
+                f"{total['p99'] * 1000:.0f} ms, "
+                f"{values['decompressed_bytes']['p50'] / 1024:.1f} KiB "
+                f"({total['count']} requests)"
+            )
+    _print("\n".join(lines))
+
+
+def _first_listing_id(listing_ids: list):
+    return listing_ids[0]
+
+
+def _checks(
+    client: DynamicAPIClient,
+    fleet: bool = False,
+    fleet_sample_size: int = None,
+    fleet_max_workers: int = FLEET_MAX_WORKERS,
+    streaming: bool = False,
+    high_water_marks: HighWaterMarks = None,
+    validation_cache: ValidationCache = None,
+    consistency: bool = False,
+    calendar_rules: bool = False,
+):
+    """Returns the fixtures and checks of a run. Checks name the fixtures they
+    need in `requires` and receive them as keyword arguments."""
+    fixtures = [
+        Task("listing_ids", client.get_listing_ids),
+        Task("listing_id", _first_listing_id, requires=("listing_ids",)),
+    ]
+    checks = [
+        Task(
+            "GET /account status:200",
+            partial(_validate_account_endpoint_returns_200, client),
+        ),
+        Task(
+            "GET /account status:401",
+            partial(_validate_account_endpoint_returns_401, client),
+        ),
+        Task(
+            "GET /listings status:200",
+            partial(_validate_listing_ids_endpoint_returns_200, client),
+            requires=("listing_ids",),
+        ),
+        Task(
+            "GET /listings/invalid-id status:404",
+            partial(_validate_listing_endpoint_returns_404, client),
+        ),
+        Task(
+            "GET /listings/invalid-id/calendar status:404",
+            partial(_validate_listing_calendar_endpoint_returns_404, client),
+        ),
+        Task(
+            "GET /listings/invalid-id/reservations status:404",
+            partial(_validate_listing_reservations_endpoint_returns_404, client),
+        ),
+        Task(
+            "GET /reservations/invalid-id status:404",
+            partial(_validate_reservation_endpoint_returns_404, client),
+        ),
+        Task(
+            "POST /listings/{listing_id}/calendar status:201",
+            partial(_validate_post_prices_endpoint_returns_201, client),
+            requires=("listing_id",),
+        ),
+        Task(
+            "POST /listings/invalid-id/calendar status:404",
+            partial(_validate_post_prices_endpoint_returns_404, client),
+        ),
+    ]
+    if fleet:
+        checks.append(
+            Task(
+                "Fleet",
+                partial(
+                    _validate_fleet,
+                    client,
+                    sample_size=fleet_sample_size,
+                    max_workers=fleet_max_workers,
+                    streaming=streaming,
+                    high_water_marks=high_water_marks,
+                    validation_cache=validation_cache,
+                    consistency=consistency,
+                    calendar_rules=calendar_rules,
+                ),
+                requires=("listing_ids",),
+            )
+        )
+    else:
+        # With `consistency`, the calendar and reservations checks collect
+        # what the consistency check needs while they read them.
+        consistency_fixtures = ()
+        calendar_fixtures = ()
+        if calendar_rules:
+            fixtures.append(Task("calendar_store", CalendarStore))
+            calendar_fixtures = ("calendar_store",)
+        if consistency:
+            fixtures.append(
+                Task(
+                    "listing_consistency",
+                    ListingConsistency,
+                    requires=("listing_ids",),
+                )
+            )
+            consistency_fixtures = ("listing_consistency",)
+        checks.extend(
+            [
+                Task(
+                    "GET /listings/{listing_id} status:200",
+                    partial(
+                        _validate_listing_endpoint_returns_200,
+                        client,
+                        validation_cache=validation_cache,
+                    ),
+                    requires=("listing_id",),
+                ),
+                Task(
+                    "GET /listings/{listing_id}/calendar status:200",
+                    partial(
+                        _validate_listing_calendar_endpoint_returns_200,
+                        client,
+                        streaming=streaming,
+                        validation_cache=validation_cache,
+                    ),
+                    requires=("listing_id",)
+                    + consistency_fixtures
+                    + calendar_fixtures,
+                ),
+                Task(
+                    "GET /listings/{listing_id}/reservations and "
+                    "GET /reservations/{id} status:200",
+                    partial(
+                        _validate_listing_reservations,
+                        client,
+                        streaming=streaming,
+                        high_water_marks=high_water_marks,
+                        validation_cache=validation_cache,
+                    ),
+                    requires=("listing_id",) + consistency_fixtures,
+                ),
+            ]
+        )
+        if calendar_rules:
+            checks.append(
+                Task(
+                    "GET /listings/{listing_id}/calendar rules",
+                    partial(
+                        _validate_listing_calendar_rules, client, streaming=streaming
+                    ),
+                    requires=("listing_id", "calendar_store"),
+                    after=("GET /listings/{listing_id}/calendar status:200",),
+                )
+            )
+        if consistency:
+            checks.append(
+                Task(
+                    "Listing {listing_id} consistency",
+                    partial(
+                        _validate_listing_consistency, client, streaming=streaming
+                    ),
+                    requires=("listing_id", "listing_consistency"),
+                    after=(
+                        "GET /listings/{listing_id}/calendar status:200",
+                        "GET /listings/{listing_id}/reservations and "
+                        "GET /reservations/{id} status:200",
+                    ),
+                )
+            )
+    return fixtures + checks
+
+
+def run(
+    base_url: str,
+    api_key: str,
+    disable_logging: bool = True,
+    fleet: bool = False,
+    fleet_sample_size: int = None,
+    fleet_max_workers: int = FLEET_MAX_WORKERS,
+    streaming: bool = False,
+    cache: ResponseCache = None,
+    check_max_workers: int = CHECK_MAX_WORKERS,
+    metrics: RequestMetrics = None,
+    high_water_marks: HighWaterMarks = None,
+    validation_cache: ValidationCache = None,
+    consistency: bool = CONSISTENCY_CHECKS,
+    calendar_rules: bool = CALENDAR_RULES,
+    session=None,
+    recorder: Recorder = None,
+    rate_limiter: RateLimiter = None,
+    timeouts: dict = None,
+    budget: float = None,
+    hedge: bool = False,
+    client: DynamicAPIClient = None,
+):
+    """Runs every check against the partner API at `base_url`.
+
+    Independent checks run concurrently, and fixtures shared between checks,
+    like the listing IDs, are fetched once. Responses are memoized for the
+    duration of the run. Pass the same `cache` to successive runs to
+    revalidate unchanged responses with their ETag. Pass `metrics` to record
+    the latency and payload size of every request. Pass `high_water_marks` to
+    only validate the reservations checking in since the previous run. Pass
+    `validation_cache` to skip validating the payloads unchanged since a
+    previous run. With `consistency`, also checks listings' calendars and
+    reservations agree. With `calendar_rules`, also checks calendars follow
+    the semantic rules. Pass a `recorder` to record every response, and a
+    `ReplaySession` as `session` to replay them offline. Pass a
+    `rate_limiter` to pace requests and retry throttled ones. Pass `timeouts`
+    to override the timeouts per route, and a `budget` in seconds to fail the
+    requests sent once the run took longer. With `hedge`, slow GETs are sent
+    twice, taking whichever answers first.
+
+    Pass a `client` to reuse it, with its pooled connections and caches,
+    across runs. `base_url`, `api_key` and the client options above are then
+    ignored, but `budget` still applies.
+    """
     _pre_work(disable_logging=disable_logging)
 
-    client = DynamicAPIClient(api_key, base_url)
-
-    _validate_account_endpoint_returns_200(client)
-    _validate_account_endpoint_returns_401(client)
-    _validate_listing_ids_endpoint_returns_200(client)
-    _validate_listing_endpoint_returns_200(client)
-    _validate_listing_endpoint_returns_404(client)
-    _validate_listing_calendar_endpoint_returns_200(client)
-    _validate_listing_calendar_endpoint_returns_404(client)
-    _validate_listing_reservations_endpoint_returns_200(client)
-    _validate_listing_reservations_endpoint_returns_404(client)
-    _validate_reservation_endpoint_returns_200(client)
-    _validate_reservation_endpoint_returns_404(client)
-    _validate_post_prices_endpoint_returns_201(client)
-    _validate_post_prices_endpoint_returns_404(client)
-
-run(BASE_URL, API_KEY)
\ No newline at end of file
+    if client is None:
+        if cache is None:
+            cache = ResponseCache()
+        if hedge and metrics is None:
+            # Requests are hedged past the latency observed so far.
+            metrics = RequestMetrics()
+        # Keep one pooled connection per concurrent check and fleet worker.
+        client = DynamicAPIClient(
+            api_key,
+            base_url,
+            session=session,
+            pool_maxsize=check_max_workers + fleet_max_workers,
+            cache=cache,
+            metrics=metrics,
+            recorder=recorder,
+            rate_limiter=rate_limiter,
+            timeouts=timeouts,
+            hedge=hedge,
+        )
+    client.deadline = None
+    if budget is not None:
+        client.deadline = time.monotonic() + budget
+
+    tasks = _checks(
+        client,
+        fleet=fleet,
+        fleet_sample_size=fleet_sample_size,
+        fleet_max_workers=fleet_max_workers,
+        streaming=streaming,
+        high_water_marks=high_water_marks,
+        validation_cache=validation_cache,
+        consistency=consistency,
+        calendar_rules=calendar_rules,
+    )
+    _, errors = run_tasks(tasks, max_workers=check_max_workers)
+    for task in tasks:
+        if task.name in errors:
+            _print(f"❌ {task.name} - {errors[task.name]}")
+
+if __name__ == "__main__":
+    metrics = RequestMetrics()
+    high_water_marks = None
+    if RESERVATIONS_HIGH_WATER_MARKS_PATH:
+        high_water_marks = HighWaterMarks(RESERVATIONS_HIGH_WATER_MARKS_PATH)
+    validation_cache = None
+    if VALIDATION_CACHE_PATH:
+        validation_cache = ValidationCache(VALIDATION_CACHE_PATH)
+    session = None
+    if REPLAY_PATH:
+        session = ReplaySession(REPLAY_PATH)
+    recorder = None
+    if RECORDING_PATH:
+        recorder = Recorder(RECORDING_PATH)
+    rate_limiter = None
+    # Replayed responses are not sent to the partner, so are not paced.
+    if RATE_LIMIT_RPS and not REPLAY_PATH:
+        rate_limiter = get_rate_limiter(
+            BASE_URL,
+            rate=RATE_LIMIT_RPS,
+            max_rate=RATE_LIMIT_MAX_RPS,
+            target_latency=RATE_LIMIT_TARGET_LATENCY,
+        )
+    run(
+        BASE_URL,
+        API_KEY,
+        fleet=FLEET,
+        fleet_sample_size=FLEET_SAMPLE_SIZE,
+        fleet_max_workers=FLEET_MAX_WORKERS,
+        streaming=STREAMING,
+        metrics=metrics,
+        high_water_marks=high_water_marks,
+        validation_cache=validation_cache,
+        consistency=CONSISTENCY_CHECKS,
+        calendar_rules=CALENDAR_RULES,
+        session=session,
+        recorder=recorder,
+        rate_limiter=rate_limiter,
+        timeouts=ROUTE_TIMEOUTS,
+        budget=RUN_BUDGET,
+        hedge=HEDGE_REQUESTS,
+    )
+    if recorder is not None:
+        recorder.close()
+    if session is not None:
+        session.close()
+    if high_water_marks is not None:
+        high_water_marks.save()
+    if validation_cache is not None:
+        validation_cache.close()
+    _print_metrics(metrics)
+    if METRICS_JSON_PATH:
+        metrics.write_json(METRICS_JSON_PATH)
+    if METRICS_PROMETHEUS_PATH:
+        metrics.write_prometheus_textfile(METRICS_PROMETHEUS_PATH)
\ No newline at end of file
@@ -0,0 +1,227 @@
+import contextlib
+import datetime
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import validator
+from batch_validator import _failed_checks, load_manifest
+from helpers.cache import ResponseCache
+from helpers.client import DynamicAPIClient
+from helpers.metrics import RequestMetrics
+from helpers.rate_limiter import get_rate_limiter
+from validator import (
+    API_KEY,
+    BASE_URL,
+    CHECK_MAX_WORKERS,
+    FLEET,
+    FLEET_MAX_WORKERS,
+    FLEET_SAMPLE_SIZE,
+    HEDGE_REQUESTS,
+    RATE_LIMIT_MAX_RPS,
+    RATE_LIMIT_RPS,
+    RATE_LIMIT_TARGET_LATENCY,
+    ROUTE_TIMEOUTS,
+    RUN_BUDGET,
+    STREAMING,
+    _print,
+)
+
+# Partners to watch, as a manifest like the one of `batch_validator.py`. When
+# unset, the partner configured in `validator.py` is watched.
+MANIFEST_PATH = None
+# Every partner is revalidated INTERVAL seconds after its previous run started.
+INTERVAL = 15 * 60
+# The latest results are served as JSON at http://STATUS_HOST:STATUS_PORT/status.
+STATUS_HOST = "127.0.0.1"
+STATUS_PORT = 8766
+
+
+def _isoformat(timestamp: float) -> str:
+    utc = datetime.timezone.utc
+    return datetime.datetime.fromtimestamp(timestamp, utc).isoformat()
+
+
+class PartnerWatch():
+    """A partner revalidated every `interval` seconds by the same client, so
+    its connections, cached responses and metrics survive between runs.
+
+    Cached responses are only reused within a run: each run revalidates them
+    with their ETag, however short `interval` is."""
+
+    def __init__(self, name: str, base_url: str, api_key: str, interval: float):
+        self.name = name
+        self.base_url = base_url
+        self.interval = interval
+        self.metrics = RequestMetrics()
+        rate_limiter = None
+        if RATE_LIMIT_RPS:
+            rate_limiter = get_rate_limiter(
+                base_url,
+                rate=RATE_LIMIT_RPS,
+                max_rate=RATE_LIMIT_MAX_RPS,
+                target_latency=RATE_LIMIT_TARGET_LATENCY,
+            )
+        self.client = DynamicAPIClient(
+            api_key,
+            base_url,
+            pool_maxsize=CHECK_MAX_WORKERS + FLEET_MAX_WORKERS,
+            cache=ResponseCache(),
+            metrics=self.metrics,
+            rate_limiter=rate_limiter,
+            timeouts=ROUTE_TIMEOUTS,
+            hedge=HEDGE_REQUESTS,
+        )
+        self.runs = 0
+        self.last_run = None
+        self.next_run_at = time.time()
+        self._lock = threading.Lock()
+
+    def run(self, **run_kwargs) -> dict:
+        """Runs the validator, capturing its report."""
+        output = io.StringIO()
+        error = None
+        started_at = time.time()
+        started_counter = time.perf_counter()
+        self.client.cache.expire()
+        with contextlib.redirect_stdout(output):
+            try:
+                validator.run(
+                    self.base_url,
+                    self.client.api_key,
+                    client=self.client,
+                    **run_kwargs,
+                )
+            except Exception as e:
+                error = repr(e)
+        elapsed_seconds = time.perf_counter() - started_counter
+
+        report = output.getvalue()
+        failures = _failed_checks(report)
+        last_run = {
+            "started_at": _isoformat(started_at),
+            "elapsed_seconds": elapsed_seconds,
+            "passed": not failures and error is None,
+            "failures": failures,
+            "error": error,
+            "report": report,
+        }
+        with self._lock:
+            self.runs += 1
+            self.next_run_at = started_at + self.interval
+            self.last_run = last_run
+        return last_run
+
+    def status(self) -> dict:
+        with self._lock:
+            status = {
+                "name": self.name,
+                "base_url": self.base_url,
+                "runs": self.runs,
+                "next_run_at": _isoformat(self.next_run_at),
+                "last_run": self.last_run,
+            }
+        status["latency"] = self.metrics.summary()
+        return status
+
+
+class _StatusRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/status":
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.watcher.status(), indent=2).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class Watcher():
+    """Revalidates `partners` on schedule from one resident process, so runs
+    skip the interpreter start-up, imports and schema compilation, and reuse
+    their partner's warm client.
+
+    Due partners run one after the other: their reports are captured from
+    the standard output.
+    """
+
+    def __init__(self, partners: List[PartnerWatch], **run_kwargs) -> None:
+        self.partners = partners
+        self.run_kwargs = run_kwargs
+        self.started_at = time.time()
+        self._stopped = threading.Event()
+        self._status_server = None
+
+    def run_forever(self) -> None:
+        while not self._stopped.is_set():
+            now = time.time()
+            for partner in self.partners:
+                if self._stopped.is_set() or partner.next_run_at > now:
+                    continue
+                result = partner.run(**self.run_kwargs)
+                icon = "✅" if result["passed"] else "❌"
+                details = f"{result['failures']} failed checks"
+                if result["error"] is not None:
+                    details = f"run failed with error: {result['error']}"
+                _print(
+                    f"{icon} {partner.name} - {details} in "
+                    f"{result['elapsed_seconds']:.1f}s"
+                )
+            next_run_at = min(partner.next_run_at for partner in self.partners)
+            self._stopped.wait(max(0.0, next_run_at - time.time()))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._status_server is not None:
+            self._status_server.shutdown()
+            self._status_server.server_close()
+
+    def status(self) -> dict:
+        return {
+            "started_at": _isoformat(self.started_at),
+            "partners": [partner.status() for partner in self.partners],
+        }
+
+    def serve_status(self, host: str = STATUS_HOST, port: int = STATUS_PORT):
+        """Serves `status` as JSON at `/status` from a background thread."""
+        self._status_server = ThreadingHTTPServer((host, port), _StatusRequestHandler)
+        self._status_server.watcher = self
+        thread = threading.Thread(
+            target=self._status_server.serve_forever, daemon=True
+        )
+        thread.start()
+        return self._status_server
+
+
+if __name__ == "__main__":
+    if MANIFEST_PATH:
+        manifest = load_manifest(MANIFEST_PATH)
+    else:
+        manifest = [{"name": BASE_URL, "base_url": BASE_URL, "api_key": API_KEY}]
+    watcher = Watcher(
+        [
+            PartnerWatch(
+                partner["name"], partner["base_url"], partner["api_key"], INTERVAL
+            )
+            for partner in manifest
+        ],
+        fleet=FLEET,
+        fleet_sample_size=FLEET_SAMPLE_SIZE,
+        fleet_max_workers=FLEET_MAX_WORKERS,
+        streaming=STREAMING,
+        budget=RUN_BUDGET,
+    )
+    watcher.serve_status(STATUS_HOST, STATUS_PORT)
+    print(f"Serving the status at http://{STATUS_HOST}:{STATUS_PORT}/status")
+    try:
+        watcher.run_forever()
+    except KeyboardInterrupt:
+        watcher.stop()